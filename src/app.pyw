@@ -2,7 +2,7 @@ import os, sdl2, sys, time, threading
 
 from model import Model
 from controller import Controller
-from tools import Loader
+from tools import Exporter, Loader
 from view import View
 
 class App:
@@ -50,6 +50,9 @@ class App:
             end = time.time()
             self.cap_frame_rate(end - start)
 
+        # Finish writing any export before SDL shuts down
+        Exporter.free_surface()
+
         self.view.exit()
         self.notify_background_thread()
         background_thread.join()
@@ -1,7 +1,7 @@
 import math, panels, polling, sdl2, sdl2.ext, text
 
 from camera import Camera
-from ctypes import c_int, pointer
+from ctypes import byref, c_int
 from entity_types import EntityType
 from entities import Line
 from tools import Tools, ExportCommand
@@ -10,6 +10,10 @@ from polling import PollingType
 class Controller:
     """Handles user input on the model."""
 
+    # Reused output values for querying the mouse location
+    mouse_location_x = c_int(0)
+    mouse_location_y = c_int(0)
+
     def __init__(self):
         """Initializes the user camera, UI text displayers, and UI panels."""
 
@@ -27,6 +31,14 @@ class Controller:
 
         # Whether to display the drawing grid
         self.display_grid = False
+
+        # Whether user input since the last frame may have changed what is
+        # displayed
+        self.update_needed = True
+
+        # Whether the window was resized since the last frame. Layers do not
+        # depend on the window size and are not rendered again
+        self.window_resized = True
         
         # Entities moved by the user that need additional adjustments
         # (entity that was moved : entity, new location : tuple(int, int))
@@ -50,6 +62,8 @@ class Controller:
             if self.user_closed_window(event, keystate):
                 return False
 
+            self.update_needed = True
+
             try:
                 self.get_mouse_location()
                 self.find_nearest_vertex(model)
@@ -89,12 +103,11 @@ class Controller:
     def get_mouse_location(self):
         """Retrieves user's current mouse location on the screen from SDL.
         """
-        mouse_x_ptr = pointer(c_int(0))
-        mouse_y_ptr = pointer(c_int(0))
-        sdl2.SDL_GetMouseState(mouse_x_ptr, mouse_y_ptr)
+        sdl2.SDL_GetMouseState(byref(Controller.mouse_location_x),
+                               byref(Controller.mouse_location_y))
 
-        self.mouse_x = mouse_x_ptr.contents.value
-        self.mouse_y = mouse_y_ptr.contents.value
+        self.mouse_x = Controller.mouse_location_x.value
+        self.mouse_y = Controller.mouse_location_y.value
 
     def find_nearest_vertex(self, model):
         """Finds nearest vertex within range to the mouse position.
@@ -152,8 +165,13 @@ class Controller:
         if event.type == sdl2.SDL_MOUSEWHEEL:
             self.handle_camera_zoom(event)
 
-        # Window resized by user
-        if event.type == sdl2.SDL_WINDOWEVENT:
+        # Window resized by user, the screen size and fonts must be updated
+        if event.type == sdl2.SDL_WINDOWEVENT and event.window.event\
+           == sdl2.SDL_WINDOWEVENT_SIZE_CHANGED:
+            self.window_resized = True
+
+        # Layers were lost by the renderer and must be rendered in whole again
+        if event.type == sdl2.SDL_RENDER_TARGETS_RESET:
             model.update_needed = True
     
         # Drag and drop file for loading
@@ -628,8 +646,10 @@ class Controller:
                 length = math.sqrt(
                     (self.first_point_x - adjusted_mouse_x) ** 2
                     +  (self.first_point_y - adjusted_mouse_y) ** 2)
+
+            # Whole inches, like the lengths of placed lines
             self.center_text.set_bottom_text(
-                "Length: " + Tools.convert_to_unit_system(length))
+                "Length: " + Tools.convert_to_unit_system(int(length)))
 
         # Display hint text
         self.center_text.set_top_text(
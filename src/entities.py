@@ -14,6 +14,15 @@ class Entity:
         # Layer the object is assigned to
         self.layer = layer
 
+    def overlaps(self, area):
+        """Returns whether the rendered entity may overlap the area.
+        :param area: The left, top, right, and bottom edges of the area
+        :type area: tuple(int, int, int, int)
+        """
+        bounds = self.get_bounds()
+        return bounds[0] < area[2] and area[0] < bounds[2]\
+            and bounds[1] < area[3] and area[1] < bounds[3]
+
 class Line(Entity):
     """Represents a line segment created by the user.
     Contains the starting and ending coordinates, and the thickness and color.
@@ -142,6 +151,17 @@ class Line(Entity):
         return ((b2 * c1 - b1 * c2) / determinant,\
             (a1 * c2 - a2 * c1) / determinant)
     
+    def get_bounds(self):
+        """Returns the left, top, right, and bottom edges of the area the
+        rendered line covers. The area includes the square vertices that
+        close the gaps with connecting walls, which may be thicker.
+        """
+        margin = max(self.thickness, Line.EXTERIOR_WALL)
+        return (int(min(self.start[0], self.end[0])) - margin,
+                int(min(self.start[1], self.end[1])) - margin,
+                int(max(self.start[0], self.end[0])) + margin,
+                int(max(self.start[1], self.end[1])) + margin)
+
     def add_to_model(self, model):
         """Adds the line to the model."""
         model.lines.add(self)
@@ -239,6 +259,13 @@ class RectangularEntity(Entity):
         self.height = rectangle.h
         self.horizontal = self.width >= self.height
 
+    def get_bounds(self):
+        """Returns the left, top, right, and bottom edges of the area the
+        rendered rectangle covers.
+        """
+        return (self.x - 1, self.y - 1,
+                self.x + self.width + 1, self.y + self.height + 1)
+
     def check_collision(self, other = sdl2.SDL_Rect(0, 0, 0, 0)):
         """Returns true if a rectangular collision occurs with this rectangle
         and the other.
@@ -11,7 +11,6 @@ EntityType = Enum(
     WINDOW\
     DOOR\
     BUTTON_PANEL\
-    SELECTED_BUTTON\
     BUTTON_BACKGROUND\
     SELECT_BUTTON\
     ERASE_BUTTON\
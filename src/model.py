@@ -1,7 +1,7 @@
 import math, sdl2, sys, threading
 
 from actions import AddAction, DeleteAction
-from collections import deque
+from collections import Counter, deque
 from entities import Line, Window, Door, UserText, RectangularEntity
 from entity_types import EntityType, ModelMutex
 from threading import Lock
@@ -31,8 +31,9 @@ class Model:
 
         self.init_mutexes()
 
-        # Whether the renderer must update the layers
-        self.update_needed = False
+        # Whether the renderer must update the layers. The layers are
+        # rendered in whole once before any update of only an area of them
+        self.update_needed = True
 
     def add_line(self, type, start = (0, 0), end = (0, 0), color = (0, 0, 0)):
         """Adds a line and its vertices to the model.
@@ -51,7 +52,7 @@ class Model:
             self.lines.add(line)
 
         self.update_vertices()
-        self.update_needed = True
+        self.add_update_area(line.get_bounds())
 
         with self.update_background:
             self.update_background.notify_all()
@@ -86,7 +87,7 @@ class Model:
         with self.mutexes[ModelMutex.WINDOWS]:
             self.windows.add(window)
 
-        self.update_needed = True
+        self.add_update_area(window.get_bounds())
 
         if window:
             self.actions.append(AddAction(window))
@@ -118,13 +119,48 @@ class Model:
         with self.mutexes[ModelMutex.DOORS]:
             self.doors.add(door)
 
-        self.update_needed = True
+        self.add_update_area(door.get_bounds())
 
         if door:
             self.actions.append(AddAction(door))
 
         return door
 
+    @property
+    def update_needed(self):
+        """Whether the renderer must update the layers."""
+        return self.layer_update_needed
+
+    @update_needed.setter
+    def update_needed(self, update_needed):
+        """Requests or clears an update of the whole layer.
+        :param update_needed: Whether the renderer must update the layers
+        :type update_needed: bool
+        """
+        self.layer_update_needed = update_needed
+
+        # Area of the layer (left, top, right, bottom) that changed since
+        # the last update; None if the whole layer must be updated
+        self.update_area = None
+
+    def add_update_area(self, area):
+        """Requests an update of only the area of the layer, unless an update
+        of the whole layer is already pending.
+        :param area: The left, top, right, and bottom edges of the area
+        :type area: tuple(int, int, int, int)
+        """
+        if self.layer_update_needed and not self.update_area:
+            return
+
+        if self.update_area:
+            area = (min(area[0], self.update_area[0]),
+                    min(area[1], self.update_area[1]),
+                    max(area[2], self.update_area[2]),
+                    max(area[3], self.update_area[3]))
+
+        self.update_area = area
+        self.layer_update_needed = True
+
     def add_vertices_from_line(self, line):
         """Adds starting and ending vertices of the line to the model.
         :param line: The line to add vertices for
@@ -357,36 +393,24 @@ class Model:
         - 4 x 8' exterior wall
         - 2 x 8' interior wall
         """
-        inventory = ''
-
-        exterior_walls = {}
-        interior_walls = {}
-
-        # Tally up quantities for each wall length
-        for line in self.lines:
-            if line.thickness == Line.EXTERIOR_WALL:
-                if line.length in exterior_walls:
-                    exterior_walls[line.length] += 1
-                else:
-                    exterior_walls[line.length] = 1
-            elif line.thickness == Line.INTERIOR_WALL:
-                if line.length in interior_walls:
-                    interior_walls[line.length] += 1
-                else:
-                    interior_walls[line.length] = 1
-
-        # Add to inventory string
-        for wall in exterior_walls:
-            inventory += 'Exterior wall: '\
-                + str(exterior_walls[wall]) + ' x '\
-                + Tools.convert_to_unit_system(wall) + '\n'
-
-        for wall in interior_walls:
-            inventory += 'Interior wall: '\
-                + str(interior_walls[wall]) + ' x '\
-                + Tools.convert_to_unit_system(wall) + '\n'
-
-        return inventory
+        # Tally up quantities for each wall length in a single pass. Line
+        # lengths are already integers computed once when the line is created
+        exterior_walls = Counter(line.length for line in self.lines
+                                 if line.thickness == Line.EXTERIOR_WALL)
+        interior_walls = Counter(line.length for line in self.lines
+                                 if line.thickness == Line.INTERIOR_WALL)
+
+        # Each unique length is converted only once
+        inventory = [
+            'Exterior wall: ' + str(count) + ' x '
+            + Tools.convert_to_unit_system(length) + '\n'
+            for length, count in exterior_walls.items()]
+        inventory += [
+            'Interior wall: ' + str(count) + ' x '
+            + Tools.convert_to_unit_system(length) + '\n'
+            for length, count in interior_walls.items()]
+
+        return ''.join(inventory)
 
     def close_gaps_between_walls(self, line):
         """Adds a square vertex to close gaps between two connecting
@@ -20,25 +20,63 @@ class Button:
         # Whether the button is currently selected by the user
         self.selected = False
 
-    def mouse_over(self, mouse_x, mouse_y, screen_dimensions):
-        """Returns true if the mouse positions collide with the button.
-        :param mouse_x: Mouse x-position
-        :param mouse_y: Mouse y-position
-        :type mouse_x, mouse_y: int
+        # Screen locations of the button and its icon, computed once for
+        # the screen dimensions they were computed for
+        self.screen_dimensions = None
+        self.location = None
+        self.icon_location = None
+
+    def get_location(self, screen_dimensions):
+        """Returns the location of the button on the screen. The location is
+        only computed again when the screen dimensions change.
+        :param screen_dimensions: Screen width and height
+        :type screen_dimensions: tuple(int, int)
+        """
+        if screen_dimensions != self.screen_dimensions:
+            self.update_locations(screen_dimensions)
+        return self.location
+
+    def get_icon_location(self, screen_dimensions):
+        """Returns the square location of the button icon on the screen,
+        a quarter of the button width from its left side.
         :param screen_dimensions: Screen width and height
         :type screen_dimensions: tuple(int, int)
         """
+        if screen_dimensions != self.screen_dimensions:
+            self.update_locations(screen_dimensions)
+        return self.icon_location
 
-        # Screen dimensions
+    def update_locations(self, screen_dimensions):
+        """Computes the locations of the button and its icon on the screen.
+        :param screen_dimensions: Screen width and height
+        :type screen_dimensions: tuple(int, int)
+        """
         screen_width = screen_dimensions[0]
         screen_height = screen_dimensions[1]
 
-        location = sdl2.SDL_Rect(
+        self.location = sdl2.SDL_Rect(
             int(self.relative_x * screen_width),
             int(self.relative_y * screen_height),
             int(self.relative_width * screen_width),
             int(self.relative_height * screen_height))
 
+        size = min(self.location.w, self.location.h)
+        self.icon_location = sdl2.SDL_Rect(
+            self.location.x + int(self.location.w / 4), self.location.y,
+            size, size)
+
+        self.screen_dimensions = screen_dimensions
+
+    def mouse_over(self, mouse_x, mouse_y, screen_dimensions):
+        """Returns true if the mouse positions collide with the button.
+        :param mouse_x: Mouse x-position
+        :param mouse_y: Mouse y-position
+        :type mouse_x, mouse_y: int
+        :param screen_dimensions: Screen width and height
+        :type screen_dimensions: tuple(int, int)
+        """
+        location = self.get_location(screen_dimensions)
+
         if mouse_x > location.x + location.w: return False
         if mouse_x < location.x: return False
         if mouse_y > location.y + location.h: return False
@@ -70,6 +108,29 @@ class Panel:
         # If so, the renderer will skip it when iterating the normal panels
         self.special_rendering = False
 
+        # Screen location of the panel, computed once for the screen
+        # dimensions it was computed for
+        self.screen_dimensions = None
+        self.location = None
+
+    def get_location(self, screen_dimensions):
+        """Returns the location of the panel on the screen. The location is
+        only computed again when the screen dimensions change.
+        :param screen_dimensions: Screen width and height
+        :type screen_dimensions: tuple(int, int)
+        """
+        if screen_dimensions != self.screen_dimensions:
+            screen_width = screen_dimensions[0]
+            screen_height = screen_dimensions[1]
+
+            self.location = sdl2.SDL_Rect(
+                int(self.relative_x * screen_width),
+                int(self.relative_y * screen_height),
+                int(self.relative_width * screen_width),
+                int(self.relative_height * screen_height))
+            self.screen_dimensions = screen_dimensions
+        return self.location
+
     def mouse_over(self, mouse_x, mouse_y, screen_dimensions):
         """Returns true if mouse positions collide with any of the buttons
         in the panel.
@@ -7,22 +7,46 @@ class Text:
     position and size to the application screen size (%), the font,
     and the text color."""
 
+    # Fixed attributes keep many text objects compact and fast to access
+    __slots__ = ('relative_x', 'relative_y', 'font', 'color_rgb', 'text',
+                 'dynamic')
+
+    # SDL colors shared by all text with the same r, g, b values
+    sdl_colors = {}
+
     def __init__(self, relative_x = 0, relative_y = 0,
-                 font = FontSize.SMALL, color = (0, 0, 0)):
+                 font = FontSize.SMALL, color = (0, 0, 0), dynamic = False):
         """Initializes the text."""
         self.relative_x = relative_x
         self.relative_y = relative_y
         self.font = font
-        self.color = sdl2.SDL_Color(color[0], color[1], color[2])
+        self.color_rgb = (color[0], color[1], color[2])
         self.text = ''
 
+        # Whether the text changes often, e.g. every frame. Dynamic text is
+        # rendered from the glyph atlas instead of being cached as a whole
+        self.dynamic = dynamic
+
+    @property
+    def color(self):
+        """Returns the SDL color of the text. The SDL color is only created
+        once the text is rendered and is shared by text of the same color.
+        """
+        color = Text.sdl_colors.get(self.color_rgb)
+        if color is None:
+            color = sdl2.SDL_Color(*self.color_rgb)
+            Text.sdl_colors[self.color_rgb] = color
+        return color
+
 class TimeStampedMessage(Text):
     """A text object with a time stamp (when the text was created)."""
 
+    __slots__ = ('time',)
+
     def __init__(self, text, relative_x = 0, relative_y = 0,
                  font = FontSize.SMALL, color = (0, 0, 0)):
         """Initializes the text."""
-        Text.__init__(self, relative_x, relative_y, font, color)
+        Text.__init__(self, relative_x, relative_y, font, color, True)
         self.text = text
         self.time = sdl2.SDL_GetTicks()
 
@@ -60,9 +84,10 @@ class CenterText(TextDisplayer):
         self.text.append(Text(0.50, CenterText.TOP_CENTER_RELATIVE_Y,
                          FontSize.SMALL))
         self.text.append(Text(0.50, CenterText.BOTTOM_CENTER_RELATIVE_Y,
-                         FontSize.MEDIUM))
+                         FontSize.MEDIUM, dynamic = True))
         self.text.append(Text(CenterText.BOTTOM_RIGHT_RELATIVE_X,
-                         CenterText.BOTTOM_RIGHT_RELATIVE_Y, FontSize.MEDIUM))
+                         CenterText.BOTTOM_RIGHT_RELATIVE_Y, FontSize.MEDIUM,
+                         dynamic = True))
 
     def set_top_text(self, top_text = ''):
         """Sets the text displayed at the top center of the screen.
@@ -104,15 +129,15 @@ class MessageStack(TextDisplayer):
         """Removes expired messages and adjusts the positions of the messages
         so that they stack.
         """
-        index = 0
-        for message in self.text:
+        now = sdl2.SDL_GetTicks()
+
+        # Keep only the messages that have not expired
+        self.text[:] = [message for message in self.text
+                        if MessageStack.DURATION >= now - message.time]
+
+        for index, message in enumerate(self.text):
             message.relative_y = MessageStack.RELATIVE_Y\
                 - MessageStack.SPACING * index
-            index += 1
-
-            if MessageStack.DURATION < sdl2.SDL_GetTicks() - message.time:
-                self.text.remove(message)
-                return
 
     def insert(self, list):
         """Inserts the messages from the list into the stack.
@@ -120,6 +145,9 @@ class MessageStack(TextDisplayer):
         :type list: list
         """
         for message in list:
+            # Empty messages would only take up a slot in the stack
+            if not message:
+                continue
             self.text.append(TimeStampedMessage(
                 message, MessageStack.RELATIVE_X))
 
@@ -134,7 +162,8 @@ class FPSDisplayer(TextDisplayer):
     def __init__(self):
         """Initializes the FPS displayer."""
         TextDisplayer.__init__(self)
-        self.text.append(Text(FPSDisplayer.RELATIVE_X, FPSDisplayer.RELATIVE_Y))
+        self.text.append(Text(FPSDisplayer.RELATIVE_X, FPSDisplayer.RELATIVE_Y,
+                              dynamic = True))
 
         self.last_fps = sdl2.SDL_GetTicks()
         self.frames = 0
@@ -143,7 +172,8 @@ class FPSDisplayer(TextDisplayer):
         """Updates the average frames per second of the controller thread.
         """
         self.frames += 1
-        if 1000 < sdl2.SDL_GetTicks() - self.last_fps:
+        now = sdl2.SDL_GetTicks()
+        if 1000 < now - self.last_fps:
             self.text[0].text = 'FPS: ' + str(self.frames)
-            self.last_fps = sdl2.SDL_GetTicks()
+            self.last_fps = now
             self.frames = 0
\ No newline at end of file
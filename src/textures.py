@@ -1,7 +1,16 @@
-import sdl2
+import ctypes, sdl2, sdl2.sdlimage, sdl2.sdlttf
+
+from concurrent.futures import ThreadPoolExecutor
 
 from entity_types import EntityType
 
+# First SDL version that can render geometry. pysdl2 defines
+# SDL_RenderGeometry with older versions too, but calling it raises
+GEOMETRY_VERSION = (2, 0, 18)
+
+# Whether the loaded SDL library can render geometry
+RENDER_GEOMETRY = sdl2.dll.version_tuple >= GEOMETRY_VERSION
+
 class Textures:
     """Contains and manages the application's textures and layers.
     """
@@ -9,19 +18,99 @@ class Textures:
     # Number of layers the user can choose from
     NUM_LAYERS = 4
 
+    # Maximum width and height of a layer (inches). Renderers supporting
+    # very large textures would otherwise allocate layers of hundreds of
+    # megabytes each
+    MAX_LAYER_SIZE = 4096
+
+    # Pixel formats of the layers in order of preference. Both are opaque,
+    # so layers are copied without blending. RGB888 keeps the full color
+    # depth of the drawing and its exports; RGB565 is only used by renderers
+    # without RGB888 support
+    LAYER_FORMATS = (sdl2.SDL_PIXELFORMAT_RGB888, sdl2.SDL_PIXELFORMAT_RGB565)
+
+    # Maximum width and height of the icons packed into the atlas texture
+    ATLAS_ICON_SIZE = 100
+
+    # Transparent space between icons in the atlas, so that filtering
+    # scaled icons does not sample neighbouring icons
+    ATLAS_PADDING = 2
+
+    # Number of icons per row of the atlas
+    ATLAS_COLUMNS = 8
+
+    # Directory containing the png files of the textures
+    TEXTURE_DIRECTORY = b'../res/textures/'
+
+    # Png file of each texture in the texture directory
+    TEXTURE_FILES = (
+        (EntityType.BUTTON_PANEL, b'button_panel.png'),
+
+        # Selected button background; unselected buttons tint it darker
+        (EntityType.BUTTON_BACKGROUND, b'button_alternate.png'),
+
+        (EntityType.SELECT_BUTTON, b'select_button.png'),
+        (EntityType.ERASE_BUTTON, b'erase_button.png'),
+        (EntityType.DRAW_BUTTON, b'draw_button.png'),
+        (EntityType.MOVE_BUTTON, b'move_button.png'),
+        (EntityType.MEASURE_BUTTON, b'measure_button.png'),
+        (EntityType.ADD_TEXT_BUTTON, b'add_text_button.png'),
+        (EntityType.PAN_BUTTON, b'pan_button.png'),
+        (EntityType.ZOOM_BUTTON, b'zoom_button.png'),
+        (EntityType.GRID_BUTTON, b'grid_button.png'),
+        (EntityType.LAYERS_BUTTON, b'layers_button.png'),
+        (EntityType.SETTINGS_BUTTON, b'settings_button.png'),
+        (EntityType.UNDO_BUTTON, b'undo_button.png'),
+        (EntityType.REDO_BUTTON, b'redo_button.png'),
+        (EntityType.SAVE_BUTTON, b'save_button.png'),
+        (EntityType.LOAD_BUTTON, b'load_button.png'),
+        (EntityType.INVENTORY_BUTTON, b'inventory_button.png'),
+        (EntityType.EXPORT_BUTTON, b'export_button.png'),
+        (EntityType.EXIT_BUTTON, b'exit_button.png'),
+
+        (EntityType.EXTERIOR_WALL_BUTTON, b'exterior_wall_button.png'),
+        (EntityType.INTERIOR_WALL_BUTTON, b'interior_wall_button.png'),
+        (EntityType.WINDOW_BUTTON, b'window_button.png'),
+        (EntityType.DOOR_BUTTON, b'door_button.png'),
+
+        (EntityType.LAYER, b'layer.png'),
+
+        (EntityType.RASTERIZE, b'rasterize.png'),
+        (EntityType.VECTORIZE, b'vectorize.png'),
+    )
+
+    # Png file of each texture that is only loaded once it is first used,
+    # as it is large and rarely displayed
+    LAZY_TEXTURE_FILES = (
+        (EntityType.LOADING, b'loading.png'),
+    )
+
     def get(self, texture):
         """Returns the SDL texture designated by the texture enum.
+        Textures are stored in a list indexed by the enum value.
+        Lazily loaded textures are loaded on their first use.
         :param texture: The texture enum from 'entity_types.py'
         :type texture: int (value of EntityType)
         """
-        return self.textures.get(texture)
+        loaded = self.textures[texture]
+        if not loaded and texture in self.lazy_files:
+            loaded = self.load_lazy(texture)
+        return loaded
+
+    def get_source(self, texture):
+        """Returns the area of the texture designated by the texture enum
+        within its SDL texture, or None if it covers the whole SDL texture.
+        :param texture: The texture enum from 'entity_types.py'
+        :type texture: int (value of EntityType)
+        """
+        return self.sources[texture]
 
     def get_layer(self, layer):
         """Returns the SDL texture for the layer designated by the layer index.
         :param layer: The layer index from the Textures class to return
         :type layer: int
         """
-        return self.layers.get(layer)
+        return self.layers[layer]
 
     def create(self, renderer, filename):
         """Creates and returns a SDL texture loaded from the png file.
@@ -38,100 +127,355 @@ class Textures:
         :param renderer: The SDL renderer used to create the textures
         :type renderer: SDL_Renderer
         """
-        self.textures = {}
-        self.layers = {}
-
-        # Create textures from png files in textures directory
-        self.textures[EntityType.BUTTON_PANEL.value] = self.create(
-            renderer, b'../res/textures/button_panel.png')
-        
-        self.textures[EntityType.BUTTON_BACKGROUND.value] = self.create(
-            renderer, b'../res/textures/button.png')
-        self.textures[EntityType.SELECTED_BUTTON.value] = self.create(
-            renderer, b'../res/textures/button_alternate.png')
-
-        self.textures[EntityType.SELECT_BUTTON.value] = self.create(
-            renderer, b'../res/textures/select_button.png')
-        self.textures[EntityType.ERASE_BUTTON.value] = self.create(
-            renderer, b'../res/textures/erase_button.png')
-        self.textures[EntityType.DRAW_BUTTON.value] = self.create(
-            renderer, b'../res/textures/draw_button.png')
-        self.textures[EntityType.MOVE_BUTTON.value] = self.create(
-            renderer, b'../res/textures/move_button.png')
-        self.textures[EntityType.MEASURE_BUTTON.value] = self.create(
-            renderer, b'../res/textures/measure_button.png')
-        self.textures[EntityType.ADD_TEXT_BUTTON.value] = self.create(
-            renderer, b'../res/textures/add_text_button.png')
-        self.textures[EntityType.PAN_BUTTON.value] = self.create(
-            renderer, b'../res/textures/pan_button.png')
-        self.textures[EntityType.ZOOM_BUTTON.value] = self.create(
-            renderer, b'../res/textures/zoom_button.png')
-        self.textures[EntityType.GRID_BUTTON.value] = self.create(
-            renderer, b'../res/textures/grid_button.png')
-        self.textures[EntityType.LAYERS_BUTTON.value] = self.create(
-            renderer, b'../res/textures/layers_button.png')
-        self.textures[EntityType.SETTINGS_BUTTON.value] = self.create(
-            renderer, b'../res/textures/settings_button.png')
-        self.textures[EntityType.UNDO_BUTTON.value] = self.create(
-            renderer, b'../res/textures/undo_button.png')
-        self.textures[EntityType.REDO_BUTTON.value] = self.create(
-            renderer, b'../res/textures/redo_button.png')
-        self.textures[EntityType.SAVE_BUTTON.value] = self.create(
-            renderer, b'../res/textures/save_button.png')
-        self.textures[EntityType.LOAD_BUTTON.value] = self.create(
-            renderer, b'../res/textures/load_button.png')
-        self.textures[EntityType.INVENTORY_BUTTON.value] = self.create(
-            renderer, b'../res/textures/inventory_button.png')
-        self.textures[EntityType.EXPORT_BUTTON.value] = self.create(
-            renderer, b'../res/textures/export_button.png')
-        self.textures[EntityType.EXIT_BUTTON.value] = self.create(
-            renderer, b'../res/textures/exit_button.png')
-
-        self.textures[EntityType.EXTERIOR_WALL_BUTTON.value] = self.create(
-            renderer, b'../res/textures/exterior_wall_button.png')
-        self.textures[EntityType.INTERIOR_WALL_BUTTON.value] = self.create(
-            renderer, b'../res/textures/interior_wall_button.png')
-        self.textures[EntityType.WINDOW_BUTTON.value] = self.create(
-            renderer, b'../res/textures/window_button.png')
-        self.textures[EntityType.DOOR_BUTTON.value] = self.create(
-            renderer, b'../res/textures/door_button.png')
-
-        self.textures[EntityType.LAYER.value] = self.create(
-            renderer, b'../res/textures/layer.png')
-
-        self.textures[EntityType.RASTERIZE.value] = self.create(
-            renderer, b'../res/textures/rasterize.png')
-        self.textures[EntityType.VECTORIZE.value] = self.create(
-            renderer, b'../res/textures/vectorize.png')
-
-        self.textures[EntityType.LOADING.value] = self.create(
-            renderer, b'../res/textures/loading.png')
-
-        # Get maximum texture size
+        self.textures = [None] * (len(EntityType) + 1)
+        self.sources = [None] * (len(EntityType) + 1)
+        self.layers = []
+
         info = sdl2.SDL_RendererInfo()
         sdl2.SDL_GetRendererInfo(renderer, info)
-        layer_width = int(info.max_texture_width * 0.25)
-        layer_height = int(info.max_texture_height * 0.25)
+        texture_format = self.get_texture_format(info)
+
+        # Kept to load the lazily loaded textures once they are first used
+        self.renderer = renderer
+        self.texture_format = texture_format
+        self.lazy_files = {entity_type.value: filename for entity_type,
+                           filename in Textures.LAZY_TEXTURE_FILES}
 
-        # Create layers
+        # Decode the png files in parallel; decoding does not involve the
+        # renderer, and ctypes releases the GIL while SDL_image decodes
+        with ThreadPoolExecutor() as pool:
+            surfaces = pool.map(self.decode, [
+                Textures.TEXTURE_DIRECTORY + filename
+                for entity_type, filename in Textures.TEXTURE_FILES],
+                [texture_format] * len(Textures.TEXTURE_FILES))
+
+        # Textures must be created on the rendering thread. Icons are packed
+        # into the atlas, the larger textures are created as is
+        icons = []
+        for (entity_type, filename), surface in zip(Textures.TEXTURE_FILES,
+                                                    surfaces):
+            if surface and surface.contents.w <= Textures.ATLAS_ICON_SIZE\
+               and surface.contents.h <= Textures.ATLAS_ICON_SIZE:
+                icons.append((entity_type, surface))
+                continue
+
+            self.textures[entity_type.value] =\
+                sdl2.SDL_CreateTextureFromSurface(renderer, surface)
+            sdl2.SDL_FreeSurface(surface)
+
+        self.load_atlas(renderer, icons, texture_format)
+
+        # Each layer dimension is a quarter of the maximum texture size up to
+        # the maximum layer size
+        layer_width = min(int(info.max_texture_width * 0.25),
+                          Textures.MAX_LAYER_SIZE)
+        layer_height = min(int(info.max_texture_height * 0.25),
+                           Textures.MAX_LAYER_SIZE)
+
+        # Create layers and clear each of them to white
+        layer_format = self.get_layer_format(info)
+        sdl2.SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255)
         for layer in range(Textures.NUM_LAYERS):
-            self.layers[layer] = sdl2.SDL_CreateTexture(renderer,
-                                           sdl2.SDL_PIXELFORMAT_RGBA8888,
-                                           sdl2.SDL_TEXTUREACCESS_TARGET,
-                                           layer_width, layer_height)
-            sdl2.SDL_SetRenderTarget(renderer, self.layers[0])
-            sdl2.SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255)
+            texture = sdl2.SDL_CreateTexture(renderer, layer_format,
+                                             sdl2.SDL_TEXTUREACCESS_TARGET,
+                                             layer_width, layer_height)
+            self.layers.append(texture)
+            sdl2.SDL_SetRenderTarget(renderer, texture)
             sdl2.SDL_RenderClear(renderer)
-            
+
         sdl2.SDL_SetRenderTarget(renderer, None)
         return (layer_width, layer_height)
 
+    def load_lazy(self, texture):
+        """Creates, stores, and returns the lazily loaded texture designated
+        by the texture enum.
+        :param texture: The texture enum from 'entity_types.py'
+        :type texture: int (value of EntityType)
+        """
+        surface = self.decode(
+            Textures.TEXTURE_DIRECTORY + self.lazy_files[texture],
+            self.texture_format)
+        self.textures[texture] = sdl2.SDL_CreateTextureFromSurface(
+            self.renderer, surface)
+        sdl2.SDL_FreeSurface(surface)
+        return self.textures[texture]
+
+    def decode(self, filename, texture_format):
+        """Decodes the png file and returns its surface converted to the
+        texture format, so that creating its texture on the rendering thread
+        is a plain upload without a conversion.
+        :param filename: The relative location of the png file
+        :type filename: bytes
+        :param texture_format: The pixel format of the renderer's textures
+        :type texture_format: int
+        """
+        surface = sdl2.sdlimage.IMG_Load(filename)
+        if not surface:
+            return surface
+
+        converted = sdl2.SDL_ConvertSurfaceFormat(surface, texture_format, 0)
+        sdl2.SDL_FreeSurface(surface)
+        return converted
+
+    def get_texture_format(self, info):
+        """Returns the first pixel format with an alpha channel supported by
+        the renderer, which SDL uses for textures created from surfaces
+        with transparency.
+        :param info: Information about the renderer
+        :type info: SDL_RendererInfo
+        """
+        for texture_format in info.texture_formats[:info.num_texture_formats]:
+            if sdl2.SDL_ISPIXELFORMAT_ALPHA(texture_format):
+                return texture_format
+        return sdl2.SDL_PIXELFORMAT_ARGB8888
+
+    def load_atlas(self, renderer, icons, texture_format):
+        """Copies the icons into a single atlas texture, so that icons drawn
+        one after another are copied from the same texture and can be
+        batched by the renderer. The icons are stored as the atlas texture
+        along with their source rectangle within it. Frees the icon surfaces.
+        :param renderer: The SDL renderer used to create the atlas texture
+        :type renderer: SDL_Renderer
+        :param icons: The texture enum and decoded surface of each icon
+        :type icons: list(tuple(EntityType, SDL_Surface))
+        :param texture_format: The pixel format of the icon surfaces
+        :type texture_format: int
+        """
+        cell_size = Textures.ATLAS_ICON_SIZE + Textures.ATLAS_PADDING
+        columns = Textures.ATLAS_COLUMNS
+        rows = max(-(-len(icons) // columns), 1)
+
+        atlas = sdl2.SDL_CreateRGBSurfaceWithFormat(
+            0, columns * cell_size, rows * cell_size, 32, texture_format)
+
+        # Copy the icons as is, including their transparency
+        for index, (entity_type, surface) in enumerate(icons):
+            x = index % columns * cell_size
+            y = index // columns * cell_size
+            sdl2.SDL_SetSurfaceBlendMode(surface, sdl2.SDL_BLENDMODE_NONE)
+            sdl2.SDL_BlitSurface(surface, None, atlas,
+                                 sdl2.SDL_Rect(x, y, 0, 0))
+            self.sources[entity_type.value] = sdl2.SDL_Rect(
+                x, y, surface.contents.w, surface.contents.h)
+            sdl2.SDL_FreeSurface(surface)
+
+        self.atlas = sdl2.SDL_CreateTextureFromSurface(renderer, atlas)
+        sdl2.SDL_SetTextureBlendMode(self.atlas, sdl2.SDL_BLENDMODE_BLEND)
+        sdl2.SDL_FreeSurface(atlas)
+
+        for entity_type, surface in icons:
+            self.textures[entity_type.value] = self.atlas
+
+    def get_layer_format(self, info):
+        """Returns the first layer pixel format supported by the renderer.
+        Layers are opaque, so formats without an alpha channel are used.
+        :param info: Information about the renderer
+        :type info: SDL_RendererInfo
+        """
+        supported = info.texture_formats[:info.num_texture_formats]
+        for layer_format in Textures.LAYER_FORMATS:
+            if layer_format in supported:
+                return layer_format
+        return Textures.LAYER_FORMATS[0]
+
     def unload(self):
         """Frees memory allocated by SDL for each texture and layer.
         """
         for texture in self.textures:
-            sdl2.SDL_DestroyTexture(self.textures[texture])
+            if texture and texture is not self.atlas:
+                sdl2.SDL_DestroyTexture(texture)
+        sdl2.SDL_DestroyTexture(self.atlas)
+        self.atlas = None
         for layer in self.layers:
-            sdl2.SDL_DestroyTexture(self.layers[layer])
+            sdl2.SDL_DestroyTexture(layer)
         self.textures.clear()
-        self.layers.clear()
\ No newline at end of file
+        self.sources.clear()
+        self.layers.clear()
+
+class GlyphAtlas:
+    """Texture containing every printable ASCII glyph of a font. Strings are
+    rendered by copying their glyphs from the atlas, so text that changes
+    every frame does not need to be rasterized every frame.
+    """
+
+    # Range of printable ASCII characters stored in the atlas
+    FIRST_CHARACTER = 32
+    LAST_CHARACTER = 126
+
+    def __init__(self, renderer, font):
+        """Rasterizes the glyphs of the font in white into the atlas texture.
+        The text color is applied with a color modulation when rendering.
+        :param renderer: The SDL renderer used to create the atlas texture
+        :type renderer: SDL_Renderer
+        :param font: The TTF font to rasterize
+        :type font: TTF_Font
+        """
+        self.height = sdl2.sdlttf.TTF_FontHeight(font)
+
+        # Whether queued strings are flushed as geometry
+        self.render_geometry = RENDER_GEOMETRY
+
+        # Source rectangle of each glyph in the atlas, indexed by character
+        self.glyphs = {}
+
+        # Horizontal distance to the next glyph, indexed by character
+        self.advances = {}
+        advance = ctypes.c_int(0)
+
+        glyph_surfaces = []
+        atlas_width = 0
+        for character in range(GlyphAtlas.FIRST_CHARACTER,
+                               GlyphAtlas.LAST_CHARACTER + 1):
+            # Characters without a glyph, such as spaces, still advance
+            if sdl2.sdlttf.TTF_GlyphMetrics(font, character, None, None, None,
+                                            None, ctypes.byref(advance)) == 0:
+                self.advances[chr(character)] = advance.value
+
+            surface = sdl2.sdlttf.TTF_RenderGlyph_Blended(
+                font, character, sdl2.SDL_Color(255, 255, 255))
+            if not surface:
+                continue
+
+            self.glyphs[chr(character)] = sdl2.SDL_Rect(
+                atlas_width, 0, surface.contents.w, self.height)
+            glyph_surfaces.append((surface, atlas_width))
+            atlas_width += surface.contents.w
+
+        atlas = sdl2.SDL_CreateRGBSurfaceWithFormat(
+            0, max(atlas_width, 1), self.height, 32,
+            sdl2.SDL_PIXELFORMAT_RGBA32)
+
+        # Copy the glyphs as is, including their transparency
+        for surface, x in glyph_surfaces:
+            sdl2.SDL_SetSurfaceBlendMode(surface, sdl2.SDL_BLENDMODE_NONE)
+            sdl2.SDL_BlitSurface(surface, None, atlas,
+                                 sdl2.SDL_Rect(x, 0, 0, 0))
+            sdl2.SDL_FreeSurface(surface)
+
+        self.texture = sdl2.SDL_CreateTextureFromSurface(renderer, atlas)
+        sdl2.SDL_SetTextureBlendMode(self.texture, sdl2.SDL_BLENDMODE_BLEND)
+        sdl2.SDL_FreeSurface(atlas)
+
+        self.width = max(atlas_width, 1)
+
+        # Strings waiting to be drawn together, as (string, x, y, color)
+        self.queue = []
+
+    def has_characters(self, string):
+        """Returns whether every character of the string can be rendered
+        from the atlas.
+        :param string: The string to check
+        :type string: str
+        """
+        advances = self.advances
+        return all(character in advances for character in string)
+
+    def get_width(self, string):
+        """Returns the width of the string when rendered from the atlas.
+        :param string: The string to measure
+        :type string: str
+        """
+        advances = self.advances
+        return sum(advances.get(character, 0) for character in string)
+
+    def render(self, renderer, string, x, y, color):
+        """Renders the string with its top left corner at the location.
+        Characters without a glyph only move the following characters.
+        :param renderer: The SDL renderer
+        :type renderer: SDL_Renderer
+        :param string: The string to render
+        :type string: str
+        :param x, y: The top left location of the string
+        :type x, y: int
+        :param color: The color of the text
+        :type color: SDL_Color
+        """
+        sdl2.SDL_SetTextureColorMod(self.texture, color.r, color.g, color.b)
+
+        location = sdl2.SDL_Rect(x, y, 0, self.height)
+        for character in string:
+            glyph = self.glyphs.get(character)
+            if glyph:
+                location.w = glyph.w
+                sdl2.SDL_RenderCopy(renderer, self.texture, glyph, location)
+            location.x += self.advances.get(character, 0)
+
+    def queue_render(self, string, x, y, color):
+        """Queues the string to be rendered with its top left corner at the
+        location the next time the atlas is flushed.
+        :param string: The string to render
+        :type string: str
+        :param x, y: The top left location of the string
+        :type x, y: int
+        :param color: The color of the text
+        :type color: SDL_Color
+        """
+        self.queue.append((string, x, y, color))
+
+    def flush(self, renderer):
+        """Renders every queued string. All glyphs are submitted as textured
+        quads in a single geometry draw call when the SDL version supports
+        it, otherwise each string is rendered glyph by glyph.
+        :param renderer: The SDL renderer
+        :type renderer: SDL_Renderer
+        """
+        if not self.queue:
+            return
+
+        if not self.render_geometry:
+            for string, x, y, color in self.queue:
+                self.render(renderer, string, x, y, color)
+            self.queue.clear()
+            return
+
+        # Local names avoid attribute lookups for every glyph
+        SDL_Vertex = sdl2.SDL_Vertex
+        SDL_FPoint = sdl2.SDL_FPoint
+        glyphs = self.glyphs
+        advances = self.advances
+        width = self.width
+        height = self.height
+
+        vertices = []
+        indices = []
+        for string, x, y, color in self.queue:
+            for character in string:
+                glyph = glyphs.get(character)
+                if not glyph:
+                    x += advances.get(character, 0)
+                    continue
+
+                left = glyph.x / width
+                right = (glyph.x + glyph.w) / width
+                first = len(vertices)
+
+                vertices.append(SDL_Vertex(
+                    SDL_FPoint(x, y), color, SDL_FPoint(left, 0)))
+                vertices.append(SDL_Vertex(
+                    SDL_FPoint(x + glyph.w, y), color, SDL_FPoint(right, 0)))
+                vertices.append(SDL_Vertex(
+                    SDL_FPoint(x + glyph.w, y + height), color,
+                    SDL_FPoint(right, 1)))
+                vertices.append(SDL_Vertex(
+                    SDL_FPoint(x, y + height), color, SDL_FPoint(left, 1)))
+
+                # Two triangles per glyph quad
+                indices.extend((first, first + 1, first + 2,
+                                first, first + 2, first + 3))
+                x += advances.get(character, 0)
+        self.queue.clear()
+
+        if not vertices:
+            return
+
+        # Vertex colors tint the glyphs, so reset any previous color mod
+        sdl2.SDL_SetTextureColorMod(self.texture, 255, 255, 255)
+        sdl2.SDL_RenderGeometry(
+            renderer, self.texture,
+            (sdl2.SDL_Vertex * len(vertices))(*vertices), len(vertices),
+            (ctypes.c_int * len(indices))(*indices), len(indices))
+
+    def unload(self):
+        """Frees memory allocated by SDL for the atlas texture."""
+        sdl2.SDL_DestroyTexture(self.texture)
+        self.texture = None
@@ -1,6 +1,12 @@
-import pickle, sdl2, sdl2.sdlimage
+import functools, pickle, sys, threading
 
-from ctypes import c_int, pointer
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import byref, c_int, c_ubyte
+
+# SDL functions bound once for the export path
+from sdl2 import SDL_CreateRGBSurface, SDL_FreeSurface, SDL_GetTicks,\
+    SDL_QueryTexture, SDL_RenderReadPixels, SDL_SetRenderTarget
+from sdl2.sdlimage import IMG_SavePNG
 
 class ExportCommand:
     """The command that exports the drawing to a png file."""
@@ -16,6 +22,23 @@ class Exporter:
     # Last time an export was completed
     last_export = -EXPORT_INTERVAL
 
+    # Guards the last export time
+    export_lock = threading.Lock()
+
+    # Worker thread that encodes the exported pixels into the png file,
+    # so that the application loop does not stall on the compression
+    export_pool = ThreadPoolExecutor(max_workers = 1)
+
+    # Future of the most recently submitted png encode
+    pending_export = None
+
+    # Reused output values for querying the texture dimensions
+    width = c_int(0)
+    height = c_int(0)
+
+    # Surface the pixels are read into, reused while the size is unchanged
+    surface = None
+
     def __init__(self, renderer, texture):
         """Exports the texture into a png file.
         :param renderer: The SDL renderer
@@ -25,30 +48,98 @@ class Exporter:
         """
 
         # Do not perform more than one export in a 5 second period
-        if Exporter.EXPORT_INTERVAL > sdl2.SDL_GetTicks()\
-            - Exporter.last_export:
-            return
-
-        sdl2.SDL_SetRenderTarget(renderer, texture)
+        with Exporter.export_lock:
+            now = SDL_GetTicks()
+            if Exporter.EXPORT_INTERVAL > now - Exporter.last_export:
+                return
+
+            SDL_SetRenderTarget(renderer, texture)
+
+            SDL_QueryTexture(texture, None, None,
+                             byref(Exporter.width), byref(Exporter.height))
+            surface = Exporter.get_surface(
+                Exporter.width.value, Exporter.height.value)
+
+            # Reading the pixels must happen on the rendering thread
+            SDL_RenderReadPixels(
+                renderer, None, surface.contents.format.contents.format,
+                surface.contents.pixels, surface.contents.pitch)
+
+            SDL_SetRenderTarget(renderer, None)
+
+            # The worker thread encodes the surface until the next export
+            Exporter.pending_export = Exporter.export_pool.submit(
+                Exporter.save, surface)
+            Exporter.last_export = now
+
+    def get_surface(width, height):
+        """Returns the export surface, only creating a new surface when the
+        dimensions differ from the previous export. Waits for the previous
+        export to finish encoding before handing its surface out again.
+        :param width, height: The dimensions of the export
+        :type width, height: int
+        """
+        Exporter.wait()
 
-        width = pointer(c_int(0))
-        height = pointer(c_int(0))
-        sdl2.SDL_QueryTexture(texture, None, None, width, height)
-        width = width.contents.value
-        height = height.contents.value
+        surface = Exporter.surface
+        if surface and surface.contents.w == width\
+           and surface.contents.h == height:
+            return surface
 
-        surface = sdl2.SDL_CreateRGBSurface(
+        Exporter.free_surface()
+        Exporter.surface = SDL_CreateRGBSurface(
             0, width, height, 32, 0, 0, 0, 0)
+        return Exporter.surface
 
-        sdl2.SDL_RenderReadPixels(
-            renderer, None, surface.contents.format.contents.format,
-            surface.contents.pixels, surface.contents.pitch)
+    def free_surface():
+        """Frees the export surface once no export is using it.
+        """
+        Exporter.wait()
+        if Exporter.surface:
+            SDL_FreeSurface(Exporter.surface)
+            Exporter.surface = None
+
+    def save(surface, filename = b'export.png'):
+        """Encodes the surface into a png file.
+        :param surface: The SDL surface containing the exported pixels
+        :type surface: SDL_Surface
+        :param filename: The png filename to save to
+        :type filename: bytes
+        """
+        Exporter.postprocess(Exporter.get_pixels(surface),
+                             surface.contents.w, surface.contents.h,
+                             surface.contents.pitch)
 
-        sdl2.sdlimage.IMG_SavePNG(surface, b'export.png')
-        sdl2.SDL_FreeSurface(surface)
+        IMG_SavePNG(surface, filename)
+
+    def get_pixels(surface):
+        """Returns a writable view of the surface pixels without copying them.
+        :param surface: The SDL surface
+        :type surface: SDL_Surface
+        """
+        size = surface.contents.h * surface.contents.pitch
+        return memoryview(
+            (c_ubyte * size).from_address(surface.contents.pixels))
+
+    def postprocess(pixels, width, height, pitch):
+        """Transforms the exported pixels in place before they are encoded.
+        Does nothing by default. Replace this function to, for instance,
+        color correct the export; the view can be handed to vectorized
+        libraries without a copy.
+        :param pixels: Writable view of the 32 bit pixels, row by row
+        :type pixels: memoryview
+        :param width, height: The dimensions of the export
+        :type width, height: int
+        :param pitch: The length of a row of pixels in bytes
+        :type pitch: int
+        """
+        pass
 
-        sdl2.SDL_SetRenderTarget(renderer, None)
-        last_export = sdl2.SDL_GetTicks()
+    def wait():
+        """Blocks until the most recently submitted png encode is finished.
+        """
+        if Exporter.pending_export:
+            Exporter.pending_export.result()
 
 class Loader:
     """Loads model entities from a save file."""
@@ -73,15 +164,26 @@ class Tools:
     def convert_to_unit_system(value, unit_system = 'ft'):
         """Returns the value in the unit system specified.
         Currently only supports feet and inches.
-        :param value: The pixel value, default as inches
-        :type value: double
+        :param value: The pixel value, default as inches. Callers should
+        pass whole inches; other values are truncated towards zero
+        :type value: int
         :param unit_system: The target unit system
         :type unit_system: str
         """
-        value = abs(value)
-
-        if unit_system == 'ft':
-            feet = value // 12
-            inches = value - feet * 12
-            return str(int(feet)) + " ft " + str(int(inches)) + " in"
-        return ''
\ No newline at end of file
+        if unit_system != 'ft':
+            return ''
+
+        # Quantize to whole inches so that the cache is keyed on a small
+        # set of integers rather than on arbitrary floats
+        return Tools.convert_to_feet_and_inches(int(abs(value)))
+
+    @functools.lru_cache(maxsize = 4096)
+    def convert_to_feet_and_inches(inches):
+        """Returns the string of the inches in feet and inches. Results are
+        cached as the same lengths are converted repeatedly while rendering,
+        and interned so that text cache lookups compare them by identity.
+        :param inches: The positive number of inches
+        :type inches: int
+        """
+        feet, inches = divmod(inches, 12)
+        return sys.intern(f'{feet} ft {inches} in')
\ No newline at end of file
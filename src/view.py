@@ -1,15 +1,40 @@
-import ctypes, sdl2, sdl2.sdlgfx, sdl2.sdlimage, sdl2.sdlttf
+import ctypes, math, sdl2, sdl2.sdlgfx, sdl2.sdlimage, sdl2.sdlttf, sys
 
-from ctypes import c_int, pointer
+from collections import OrderedDict
+from ctypes import byref, c_int
 from entity_types import EntityType
-from enum import Enum
-from textures import Textures
+from textures import GlyphAtlas, Textures, RENDER_GEOMETRY
 
 class View:
     """Responsible for rendering entities from the model and the user
     interface onto the screen.
     """
 
+    # Maximum number of rendered text textures kept in the text cache
+    TEXT_CACHE_SIZE = 512
+
+    # Color of the text placed by the user
+    USER_TEXT_COLOR = sdl2.SDL_Color(0, 0, 0)
+
+    # Number of triangles of the circles marking vertices
+    VERTEX_MARKER_SEGMENTS = 32
+
+    # Color of the circles marking vertices
+    VERTEX_MARKER_COLOR = sdl2.SDL_Color(255, 0, 0)
+
+    # Color modulation of the button background texture for selected and
+    # unselected buttons, so both share the texture of the selected color
+    SELECTED_BUTTON_COLOR = sdl2.SDL_Color(255, 255, 255)
+    BUTTON_COLOR = sdl2.SDL_Color(183, 183, 183)
+
+    # Reused rectangles for copying the layer and text onto the screen
+    source_rect = sdl2.SDL_Rect()
+    destination_rect = sdl2.SDL_Rect()
+
+    # Reused output values for querying the window size
+    window_width = c_int(0)
+    window_height = c_int(0)
+
     def __init__(self):
         """Initializes SDL subsystems, SDL components, textures, and fonts
         necessary for rendering.
@@ -20,40 +45,74 @@ class View:
         self.init_renderer()
         self.set_dpi_awareness()
         self.init_textures()
+        self.init_text_cache()
         self.init_fonts()
+        self.init_vertex_marker()
         self.reset_camera_values()
 
+        # Whether lines and vertex markers are rendered as geometry
+        self.render_geometry = RENDER_GEOMETRY
+
+        # Camera and user interface text of the last rendered frame
+        self.last_frame = None
+
     def update(self, model, controller):
         """Updates the application window with entities from the model
-        and the user interface.
+        and the user interface. Nothing is rendered if nothing displayed
+        could have changed since the last frame.
         """
+        if not self.frame_changed(model, controller):
+            return
 
-        try:
-            self.clear_buffer()
-            self.fetch_camera_values(controller)
+        self.clear_buffer()
+        self.fetch_camera_values(controller)
 
-            if model.update_needed:
-                self.update_screen_size()
-                self.resize_fonts()
-                self.update_layer(model, controller)
-                model.update_needed = False
+        if controller.window_resized:
+            self.update_screen_size()
+            self.resize_fonts()
+            controller.window_resized = False
 
-            self.render_layer(controller.current_layer)
-            self.render_text_from_model(controller, model)
+        if model.update_needed:
+            self.update_layer(model, controller)
+            model.update_needed = False
 
-            self.render_ui_panels(controller)
-            self.render_ui_text(controller)
-            self.render_two_point_placement(controller, model)
-            self.render_moving_vertex(controller)
-            self.render_mouse_selection(controller)
+        self.render_layer(controller.current_layer)
+        self.render_text_from_model(controller, model)
 
-            if controller.loading:
-                self.render_loading()
+        self.render_ui_panels(controller)
+        self.render_ui_text(controller)
+        self.render_two_point_placement(controller, model)
+        self.render_moving_vertex(controller)
+        self.render_mouse_selection(controller)
+
+        if controller.loading:
+            self.render_loading()
+
+        self.swap_buffer()
+
+    def frame_changed(self, model, controller):
+        """Returns whether the frame needs to be rendered again. It does when
+        the model changed, there was user input, a task is loading, or the
+        camera or user interface text changed since the last frame.
+        :param model: The application model
+        :type model: Model from 'model.py'
+        :param controller: The application controller
+        :type controller: Controller from 'controller.py'
+        """
+        camera = controller.camera
+        text = tuple(text.text for text_displayer in controller.text_displayers
+                     for text in text_displayer.text)
+        frame = (camera.x, camera.y, camera.scale, controller.current_layer,
+                 text)
+
+        if not model.update_needed and not controller.update_needed\
+           and not controller.loading and frame == self.last_frame:
+            return False
+
+        self.last_frame = frame
+        controller.update_needed = False
+        return True
 
-            self.swap_buffer()
-        except:
-            return
-        
     def clear_buffer(self):
         """Clears the contents displayed on the window.
         """
@@ -76,26 +135,45 @@ class View:
         """Sets the screen width and height to the application's current
         window resolution, necessary when user resizes the window.
         """
-        width = pointer(c_int(0))
-        height = pointer(c_int(0))
-        sdl2.SDL_GetWindowSize(self.window, width, height)
-        self.screen_width = width.contents.value
-        self.screen_height = height.contents.value
+        sdl2.SDL_GetWindowSize(self.window, byref(View.window_width),
+                               byref(View.window_height))
+        self.screen_width = View.window_width.value
+        self.screen_height = View.window_height.value
+
+        # Pixel positions of text depend on the screen size
+        self.text_positions = {}
 
     def update_layer(self, model, controller):
         """Renders entities from model onto their corresponding layer.
         This optimizes rendering as rendering the layer once renders all
         entities simultaneously, instead of rendering each entity every frame.
+        If only an area of the layer changed, only that area is cleared and
+        only the entities overlapping it are rendered again.
         """
         sdl2.SDL_SetRenderTarget(self.renderer, self.textures.get_layer(
                                  controller.current_layer))
         sdl2.SDL_SetRenderDrawColor(self.renderer, 255, 255, 255, 255)
-        sdl2.SDL_RenderClear(self.renderer)
 
-        return self.render_entities(model, controller)
+        area = model.update_area
+        if area:
+            clip = sdl2.SDL_Rect(area[0], area[1],
+                                 area[2] - area[0], area[3] - area[1])
+            sdl2.SDL_RenderSetClipRect(self.renderer, clip)
+            sdl2.SDL_RenderFillRect(self.renderer, clip)
+        else:
+            sdl2.SDL_RenderClear(self.renderer)
+
+        entities_rendered = self.render_entities(model, controller, area)
 
-    def render_entities(self, model, controller):
+        sdl2.SDL_RenderSetClipRect(self.renderer, None)
+        sdl2.SDL_SetRenderTarget(self.renderer, None)
+        return entities_rendered
+
+    def render_entities(self, model, controller, area = None):
         """Renders the entities from the model onto the renderer target.
+        :param area: The left, top, right, and bottom edges of the area to
+        render the entities within, or None to render every entity
+        :type area: tuple(int, int, int, int)
         """
 
         entities_rendered = 0
@@ -103,60 +181,132 @@ class View:
         # Render drawing grid
         if controller.display_grid:
             sdl2.SDL_SetRenderDrawColor(self.renderer, 0xB2, 0xB2, 0xB2, 0xFF)
-            for i in range(self.layer_width):
-                sdl2.SDL_RenderDrawLine(
-                    self.renderer, -controller.snap_interval,
-                    i * controller.snap_interval * 2,
-                    self.layer_width,
-                    i * controller.snap_interval * 2)
-                sdl2.SDL_RenderDrawLine(
-                    self.renderer, i * controller.snap_interval * 2,
-                    -controller.snap_interval,
-                    i * controller.snap_interval * 2,
-                    self.layer_width)
+            for points in self.get_grid_points(controller.snap_interval):
+                sdl2.SDL_RenderDrawLines(self.renderer, points, len(points))
+
+        current_layer = controller.current_layer
 
         # Render lines
-        for line in model.lines:
-            if line.layer != controller.current_layer:
-                continue
-            self.render_line(line, controller.current_layer)
-            entities_rendered += 1
+        lines = [line for line in model.lines if line.layer == current_layer
+                 and (not area or line.overlaps(area))]
+        self.render_lines(lines)
+        entities_rendered += len(lines)
 
         # Render square vertices to close the gap between connecting lines
-        for vertex in model.square_vertices:
-            if vertex.layer != controller.current_layer:
-                continue
-            self.render_square_vertex(vertex)
-            entities_rendered += 1
+        vertices = [vertex for vertex in model.square_vertices
+                    if vertex.layer == current_layer
+                    and (not area or vertex.overlaps(area))]
+        self.render_square_vertices(vertices)
+        entities_rendered += len(vertices)
 
         # Render windows
-        for window in model.windows:
-            if window.layer != controller.current_layer:
-                continue
-            self.render_window(window, controller.current_layer)
-            entities_rendered += 1
+        windows = [window for window in model.windows
+                   if window.layer == current_layer
+                   and (not area or window.overlaps(area))]
+        self.render_rectangles(windows, (255, 255, 255))
+        entities_rendered += len(windows)
 
         # Render doors
-        for door in model.doors:
-            if door.layer != controller.current_layer:
-                continue
-            self.render_door(door, controller.current_layer)
-            entities_rendered += 1
+        doors = [door for door in model.doors if door.layer == current_layer
+                 and (not area or door.overlaps(area))]
+        self.render_rectangles(doors, (128, 128, 128))
+        entities_rendered += len(doors)
 
-        sdl2.SDL_SetRenderTarget(self.renderer, None)
         return entities_rendered
 
+    def get_grid_points(self, snap_interval):
+        """Returns the points of the horizontal and of the vertical grid lines
+        as two polylines. Each polyline zigzags between the lines just outside
+        the layer, so that each can be rendered with a single call. The points
+        are computed once per snap interval.
+        :param snap_interval: The snap interval of the controller
+        :type snap_interval: int
+        """
+        grid_points = self.grid_points.get(snap_interval)
+        if grid_points:
+            return grid_points
+
+        spacing = snap_interval * 2
+        start = -snap_interval
+
+        horizontal = []
+        for index, y in enumerate(range(0, self.layer_height, spacing)):
+            ends = (start, self.layer_width)
+            if index % 2: ends = ends[::-1]
+            horizontal += (sdl2.SDL_Point(ends[0], y),
+                           sdl2.SDL_Point(ends[1], y))
+
+        vertical = []
+        for index, x in enumerate(range(0, self.layer_width, spacing)):
+            ends = (start, self.layer_height)
+            if index % 2: ends = ends[::-1]
+            vertical += (sdl2.SDL_Point(x, ends[0]),
+                         sdl2.SDL_Point(x, ends[1]))
+
+        grid_points = ((sdl2.SDL_Point * len(horizontal))(*horizontal),
+                       (sdl2.SDL_Point * len(vertical))(*vertical))
+        self.grid_points[snap_interval] = grid_points
+        return grid_points
+
     def render_layer(self, layer):
-        """Renders all contents of the layer onto the screen.
+        """Renders the contents of the layer visible to the camera onto the
+        screen. Only the visible part of the layer is copied, so that the
+        renderer does not sample the rest of the large layer texture.
         :param layer: The layer index from the Textures class to render
         :type layer: int
         """
+        source = self.get_visible_layer_area()
+        if not source:
+            return
+
+        scale = self.camera_scale
         sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get_layer(layer), None,
-            sdl2.SDL_Rect(int(-self.camera_x),
-                          int(-self.camera_y),
-                          int(self.layer_width * self.camera_scale),
-                          int(self.layer_height * self.camera_scale)))
+            self.renderer, self.textures.get_layer(layer), source,
+            self.get_destination_rect(int(source.x * scale - self.camera_x),
+                                      int(source.y * scale - self.camera_y),
+                                      int(source.w * scale),
+                                      int(source.h * scale)))
+
+    def get_visible_layer_area(self):
+        """Returns the area of the layer visible to the camera, extended to
+        whole layer pixels, or None if no part of the layer is visible.
+        The area is a reused rectangle only valid until the next call.
+        """
+        scale = self.camera_scale
+        if scale <= 0:
+            return None
+
+        left = max(0, int(self.camera_x / scale))
+        top = max(0, int(self.camera_y / scale))
+        right = min(self.layer_width,
+                    math.ceil((self.camera_x + self.screen_width) / scale))
+        bottom = min(self.layer_height,
+                     math.ceil((self.camera_y + self.screen_height) / scale))
+
+        if right <= left or bottom <= top:
+            return None
+        source = View.source_rect
+        source.x = left
+        source.y = top
+        source.w = right - left
+        source.h = bottom - top
+        return source
+
+    def get_destination_rect(self, x, y, width, height):
+        """Returns the reused destination rectangle set to the location and
+        size, so that no rectangle is allocated for each copy onto the screen.
+        The rectangle is only valid until the next call.
+        :param x, y: The top left location of the rectangle
+        :type x, y: int
+        :param width, height: The size of the rectangle
+        :type width, height: int
+        """
+        destination = View.destination_rect
+        destination.x = x
+        destination.y = y
+        destination.w = width
+        destination.h = height
+        return destination
 
     def render_text_from_model(self, controller, model):
         """Renders the user placed text from the model.
@@ -165,8 +315,9 @@ class View:
         :param model: The application model
         :type model: Model from 'model.py'
         """
+        current_layer = controller.current_layer
         for text in model.user_text:
-            if text.layer != controller.current_layer:
+            if not text.text or text.layer != current_layer:
                 continue
             self.render_user_text(text)
 
@@ -179,62 +330,124 @@ class View:
 
         for text_displayer in controller.text_displayers:
             for text in text_displayer.text:
-                self.render_relative_text(text)
+                # Empty text has nothing to render
+                if text.text:
+                    self.render_relative_text(text)
                 text_rendered += 1
 
+        # Draw the queued dynamic text of each atlas in one batch
+        for atlas in self.glyph_atlases:
+            atlas.flush(self.renderer)
+
         return text_rendered
 
     def render_relative_text(self, text):
         """Renders text at its relative location with its font and color.
+        Dynamic text is queued in its glyph atlas and drawn once the atlas
+        is flushed.
         :param text: The text to render
         :type text: Text from 'controller.py'
         """
         if not text or not text.text:
             return None
 
-        if text.font == FontSize.SMALL:
-            font = self.small_text
-        elif text.font == FontSize.MEDIUM:
-            font = self.medium_text
-        elif text.font == FontSize.LARGE:
-            font = self.large_text
+        # Dynamic text is measured and queued from the glyph atlas, unless
+        # it has characters that are not in the atlas
+        atlas = self.glyph_atlases[text.font]
+        dynamic = text.dynamic and atlas.has_characters(text.text)
+        if dynamic:
+            width = atlas.get_width(text.text)
+            height = atlas.height
+        else:
+            cached_text = self.get_text_texture(
+                text.text, text.font, self.fonts[text.font], text.color)
 
-        surface = sdl2.sdlttf.TTF_RenderText_Solid(
-            font, str.encode(text.text), text.color)
+            # Failed to create texture
+            if not cached_text: return None
 
-        # Failed to create surface
-        if not surface: return None
+            texture, width, height = cached_text
 
-        texture = sdl2.SDL_CreateTextureFromSurface(self.renderer, surface)
-        sdl2.SDL_FreeSurface(surface)
+        x, y, align_x, align_y = self.get_text_position(
+            text.relative_x, text.relative_y)
+        text_x = int(x - width * align_x)
+        text_y = y - height * align_y
 
-        width = pointer(c_int(0))
-        height = pointer(c_int(0))
-        sdl2.SDL_QueryTexture(texture, None, None, width, height)
-        width = width.contents.value
-        height = height.contents.value
+        if dynamic:
+            atlas.queue_render(text.text, text_x, text_y, text.color)
+            return True
 
-        # Center the text relative to the screen width
-        if text.relative_x == 0.50:
-            text_x = int(self.center_text(width))
-        # Place text at its specified relative location
-        else:
-            text_x = int(text.relative_x * self.screen_width)
+        sdl2.SDL_RenderCopyEx(self.renderer, texture, None,
+                              self.get_destination_rect(
+                                  text_x, text_y, width, height),
+                              0.0, None, sdl2.SDL_FLIP_NONE)
+        return True
 
-        text_y = int(self.screen_height * text.relative_y)
+    def get_text_position(self, relative_x, relative_y):
+        """Returns the pixel position of the relative location on the screen
+        and the fractions of the text width and height to move the text by
+        so that it is centered or fits the screen. Positions are computed
+        once per screen size, as text is placed at the same few relative
+        locations every frame.
+        :param relative_x, relative_y: The relative location of the text
+        :type relative_x, relative_y: float
+        """
+        key = (relative_x, relative_y)
+        position = self.text_positions.get(key)
+        if not position:
+            # Center the text relative to the screen width
+            if relative_x == 0.50:
+                x = self.screen_width / 2
+                align_x = 0.50
+            else:
+                x = int(relative_x * self.screen_width)
+                align_x = 1 if relative_x > 0.50 else 0
+
+            # Adjust location of text to fit the screen
+            align_y = 1 if relative_y > 0.50 else 0
+
+            position = (x, int(relative_y * self.screen_height),
+                        align_x, align_y)
+            self.text_positions[key] = position
+        return position
+
+    def get_text_texture(self, string, font_size, font, color):
+        """Returns the texture of the string rendered with the font and color
+        along with its width and height. Textures are cached so that text
+        which does not change between frames is only rasterized once. The
+        least recently used textures are destroyed once the cache is full.
+        :param string: The string to render
+        :type string: str
+        :param font_size: The font size used as part of the cache key
+        :type font_size: int
+        :param font: The TTF font to render with
+        :type font: TTF_Font
+        :param color: The color of the text
+        :type color: SDL_Color
+        """
+        key = (string, font_size, (color.r, color.g, color.b))
 
-        # Adjust location of text to fit the screen
-        if text.relative_y > 0.50:
-            text_y -= height
+        cached_text = self.text_cache.get(key)
+        if cached_text:
+            self.text_cache.move_to_end(key)
+            return cached_text
 
-        if text.relative_x > 0.50:
-            text_x -= width
+        # Blended text has antialiased edges that match the glyph atlases
+        surface = sdl2.sdlttf.TTF_RenderUTF8_Blended(
+            font, str.encode(string), color)
 
-        sdl2.SDL_RenderCopyEx(self.renderer, texture, None,
-                              sdl2.SDL_Rect(text_x, text_y, width, height),
-                              0.0, None, sdl2.SDL_FLIP_NONE)
-        sdl2.SDL_DestroyTexture(texture)
-        return True
+        # Failed to create surface
+        if not surface: return None
+
+        texture = sdl2.SDL_CreateTextureFromSurface(self.renderer, surface)
+        cached_text = (texture, surface.contents.w, surface.contents.h)
+        sdl2.SDL_FreeSurface(surface)
+
+        self.text_cache[key] = cached_text
+        if len(self.text_cache) > View.TEXT_CACHE_SIZE:
+            sdl2.SDL_DestroyTexture(
+                self.text_cache.popitem(last = False)[1][0])
+
+        return cached_text
 
     def render_user_text(self, text, centered = True):
         """Renders text at its absolute location in black with tiny font.
@@ -246,22 +459,13 @@ class View:
         if not text or not text.text:
             return None
 
-        font = self.tiny_text
-
-        surface = sdl2.sdlttf.TTF_RenderText_Solid(
-            font, str.encode(text.text), sdl2.SDL_Color(0, 0, 0))
-
-        # Failed to create surface
-        if not surface: return None
+        cached_text = self.get_text_texture(
+            text.text, FontSize.TINY, self.tiny_text, View.USER_TEXT_COLOR)
 
-        texture = sdl2.SDL_CreateTextureFromSurface(self.renderer, surface)
-        sdl2.SDL_FreeSurface(surface)
+        # Failed to create texture
+        if not cached_text: return None
 
-        width = pointer(c_int(0))
-        height = pointer(c_int(0))
-        sdl2.SDL_QueryTexture(texture, None, None, width, height)
-        width = width.contents.value
-        height = height.contents.value
+        texture, width, height = cached_text
 
         text_x = text.position[0]
         text_y = text.position[1]
@@ -277,9 +481,9 @@ class View:
                                     text_x + width, text_y + height)
 
         sdl2.SDL_RenderCopyEx(self.renderer, texture, None,
-                              sdl2.SDL_Rect(text_x, text_y, width, height),
+                              self.get_destination_rect(
+                                  text_x, text_y, width, height),
                               0.0, None, sdl2.SDL_FLIP_NONE)
-        sdl2.SDL_DestroyTexture(texture)
         return True
 
     def center_text(self, text_width):
@@ -295,14 +499,21 @@ class View:
         :param controller: The application controller
         :type controller: Controller from 'controller.py'
         """
-        for panel in controller.panels:
-            if not panel.visible or panel.special_rendering:
-                continue
+        panels = [panel for panel in controller.panels
+                  if panel.visible and not panel.special_rendering]
 
+        for panel in panels:
             self.render_panel(panel)
 
+        # Render every button background before the icons, so that draws
+        # sharing a texture are consecutive and SDL can batch them
+        for panel in panels:
             for button in panel.buttons:
-                self.render_button(button)
+                self.render_button_background(button)
+
+        for panel in panels:
+            for button in panel.buttons:
+                self.render_button_icon(button)
 
     def render_settings_panel(self, controller):
         """Renders the settings panel to the screen with its buttons and text.
@@ -323,45 +534,47 @@ class View:
         :param panel: The panel to render
         :type panel: Panel from 'controller.py'
         """
-        location = sdl2.SDL_Rect(
-            int(panel.relative_x * self.screen_width),
-            int(panel.relative_y * self.screen_height),
-            int(panel.relative_width * self.screen_width),
-            int(panel.relative_height * self.screen_height))
         sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get(panel.texture), None, location)
+            self.renderer, self.textures.get(panel.texture),
+            self.textures.get_source(panel.texture),
+            panel.get_location(self.get_screen_dimensions()))
         
     def render_button(self, button):
         """Renders the buttons onto the screen.
         :param button: The button to render
         :type button: Button from 'controller.py'
         """
-        location = sdl2.SDL_Rect(
-            int(button.relative_x * self.screen_width),
-            int(button.relative_y * self.screen_height),
-            int(button.relative_width * self.screen_width),
-            int(button.relative_height * self.screen_height))
+        self.render_button_background(button)
+        self.render_button_icon(button)
+
+    def render_button_background(self, button):
+        """Renders the background of the button, which shows whether the
+        button is selected.
+        :param button: The button to render
+        :type button: Button from 'controller.py'
+        """
+        background = EntityType.BUTTON_BACKGROUND.value
+        texture = self.textures.get(background)
 
         if button.selected:
-            sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get(EntityType.SELECTED_BUTTON.value),
-            None, location)
+            color = View.SELECTED_BUTTON_COLOR
         else:
-            sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get(EntityType.BUTTON_BACKGROUND.value),
-            None, location)
-        
-        # Change render location to a square
-        previous_width = location.w
-        location.x += int(previous_width / 4)
+            color = View.BUTTON_COLOR
+        sdl2.SDL_SetTextureColorMod(texture, color.r, color.g, color.b)
 
-        if location.w < location.h:
-            location.h = location.w
-        elif location.h < location.w:
-            location.w = location.h
+        sdl2.SDL_RenderCopy(
+            self.renderer, texture, self.textures.get_source(background),
+            button.get_location(self.get_screen_dimensions()))
 
+    def render_button_icon(self, button):
+        """Renders the icon of the button on the left of the button.
+        :param button: The button to render
+        :type button: Button from 'controller.py'
+        """
         sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get(button.texture), None, location)
+            self.renderer, self.textures.get(button.texture),
+            self.textures.get_source(button.texture),
+            button.get_icon_location(self.get_screen_dimensions()))
 
     def render_two_point_placement(self, controller, model):
         """Renders current line placement by the user and indicators
@@ -380,22 +593,18 @@ class View:
         # Render snapping to nearest vertex if applicable
         nearest_vertex = controller.get_nearest_vertex()
         if nearest_vertex:
-            sdl2.sdlgfx.filledCircleRGBA(
-                self.renderer,
-                int(nearest_vertex[0] * self.camera_scale - self.camera_x),
-                int(nearest_vertex[1] * self.camera_scale - self.camera_y),
-                int(3.0 * self.camera_scale), 255, 0, 0, 255)
+            self.render_vertex_marker(nearest_vertex)
 
         # Render snapping to nearest vertex axis if applicable
         nearest_vertex_axis = controller.get_nearest_axis()
         if nearest_vertex_axis:
+            mouse_x, mouse_y = self.get_camera_location(
+                (controller.mouse_x, controller.mouse_y))
+            axis_x, axis_y = self.get_camera_location(nearest_vertex_axis)
+
             sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
             sdl2.SDL_RenderDrawLine(
-                self.renderer,
-                int(controller.mouse_x * self.camera_scale - self.camera_x),
-                int(controller.mouse_y * self.camera_scale - self.camera_y),
-                int(nearest_vertex_axis[0] * self.camera_scale - self.camera_x),
-                int(nearest_vertex_axis[1] * self.camera_scale - self.camera_y))
+                self.renderer, mouse_x, mouse_y, axis_x, axis_y)
         return True
 
     def render_moving_vertex(self, controller):
@@ -407,35 +616,77 @@ class View:
         if not controller.current_moving_vertex:
             return False
 
-        sdl2.sdlgfx.filledCircleRGBA(
-                self.renderer,
-                int(controller.current_moving_vertex[0]
-                    * self.camera_scale - self.camera_x),
-                int(controller.current_moving_vertex[1]
-                    * self.camera_scale - self.camera_y),
-                int(3.0 * self.camera_scale), 255, 0, 0, 255)
+        return self.render_vertex_marker(controller.current_moving_vertex)
+
+    def render_vertex_marker(self, location):
+        """Renders a red circle around the vertex. The circle is submitted as
+        a triangle fan in a single geometry draw call when the SDL version
+        supports it, as SDL_gfx fills circles one line at a time.
+        :param location: The absolute location of the vertex
+        :type location: tuple(int, int)
+        """
+        x, y = self.get_camera_location(location)
+        radius = int(3.0 * self.camera_scale)
+
+        if not self.render_geometry:
+            sdl2.sdlgfx.filledCircleRGBA(
+                self.renderer, x, y, radius, 255, 0, 0, 255)
+            return True
+
+        color = View.VERTEX_MARKER_COLOR
+        vertices = [sdl2.SDL_Vertex(sdl2.SDL_FPoint(x, y), color)]
+        for cos, sin in self.vertex_marker_points:
+            vertices.append(sdl2.SDL_Vertex(
+                sdl2.SDL_FPoint(x + radius * cos, y + radius * sin), color))
+
+        sdl2.SDL_RenderGeometry(
+            self.renderer, None,
+            (sdl2.SDL_Vertex * len(vertices))(*vertices), len(vertices),
+            self.vertex_marker_indices, len(self.vertex_marker_indices))
         return True
 
+    def init_vertex_marker(self):
+        """Computes the points of the unit circle and the triangle indices
+        used to render vertex markers, so that only the position and radius
+        of the marker are applied when rendering.
+        """
+        segments = View.VERTEX_MARKER_SEGMENTS
+        self.vertex_marker_points = []
+        indices = []
+        for segment in range(segments):
+            angle = 2 * math.pi * segment / segments
+            self.vertex_marker_points.append((math.cos(angle),
+                                              math.sin(angle)))
+
+            # Triangle between the center and two consecutive points
+            indices.extend((0, segment + 1, (segment + 1) % segments + 1))
+        self.vertex_marker_indices = (c_int * len(indices))(*indices)
+
     def render_line_placement(self, line):
         """Renders the line provided in reference to the camera's current
         location and scale.
         :param line: The line to render
         :type line: tuple(tuple(int, int), tuple(int, int), int)
         """
-        start = line[0]
-        end = line[1]
+        start_x, start_y = self.get_camera_location(line[0])
+        end_x, end_y = self.get_camera_location(line[1])
         thickness = line[2]
 
         sdl2.sdlgfx.thickLineRGBA(
-            self.renderer,
-            int(start[0] * self.camera_scale - self.camera_x),
-            int(start[1] * self.camera_scale - self.camera_y),
-            int(end[0] * self.camera_scale - self.camera_x),
-            int(end[1] * self.camera_scale - self.camera_y),
-            int(thickness * self.camera_scale),
-            0, 0, 0, 255)
+            self.renderer, start_x, start_y, end_x, end_y,
+            int(thickness * self.camera_scale), 0, 0, 0, 255)
         return True
 
+    def get_camera_location(self, location):
+        """Returns the screen location of the absolute location for the
+        camera's current location and scale.
+        :param location: The absolute location
+        :type location: tuple(int, int)
+        """
+        scale = self.camera_scale
+        return (int(location[0] * scale - self.camera_x),
+                int(location[1] * scale - self.camera_y))
+
     def render_mouse_selection(self, controller):
         """Renders rectangle created from user pressing and dragging the mouse.
         :type controller: Controller from 'controller.py'
@@ -446,128 +697,189 @@ class View:
             self.renderer, controller.get_mouse_selection())
         return True
 
-    def render_line(self, line, layer = 0):
+    def render_lines(self, lines):
+        """Renders the lines provided with absolute location onto the current
+        render target. Each line is a quad extending half its thickness on
+        either side, and all quads are submitted in a single geometry draw
+        call when the SDL version supports it, as SDL_gfx fills each thick
+        line one row at a time.
+        :param lines: The lines to render
+        :type lines: list(Line) from 'entities.py'
+        """
+        if not self.render_geometry:
+            for line in lines:
+                self.render_line(line)
+            return True
+
+        # Local names avoid two attribute lookups for every vertex
+        SDL_Vertex = sdl2.SDL_Vertex
+        SDL_FPoint = sdl2.SDL_FPoint
+
+        colors = {}
+        vertices = []
+        indices = []
+        for line in lines:
+            start_x, start_y = line.start
+            end_x, end_y = line.end
+            length = math.hypot(end_x - start_x, end_y - start_y)
+
+            # SDL_gfx renders zero length lines as squares
+            if not length:
+                self.render_line(line)
+                continue
+
+            # Offset perpendicular to the line of half its thickness
+            offset = int(line.thickness) / 2 / length
+            offset_x = (start_y - end_y) * offset
+            offset_y = (end_x - start_x) * offset
+
+            color = line.get_color()
+            sdl_color = colors.get(color)
+            if not sdl_color:
+                sdl_color = sdl2.SDL_Color(*color)
+                colors[color] = sdl_color
+
+            first = len(vertices)
+            vertices.append(SDL_Vertex(SDL_FPoint(
+                start_x + offset_x, start_y + offset_y), sdl_color))
+            vertices.append(SDL_Vertex(SDL_FPoint(
+                end_x + offset_x, end_y + offset_y), sdl_color))
+            vertices.append(SDL_Vertex(SDL_FPoint(
+                end_x - offset_x, end_y - offset_y), sdl_color))
+            vertices.append(SDL_Vertex(SDL_FPoint(
+                start_x - offset_x, start_y - offset_y), sdl_color))
+
+            # Two triangles per line quad
+            indices.extend((first, first + 1, first + 2,
+                            first, first + 2, first + 3))
+
+        if vertices:
+            sdl2.SDL_RenderGeometry(
+                self.renderer, None,
+                (sdl2.SDL_Vertex * len(vertices))(*vertices), len(vertices),
+                (c_int * len(indices))(*indices), len(indices))
+        return True
+
+    def render_line(self, line):
         """Renders the line provided with absolute location (as opposed to
-        relative to the camera) onto the layer provided.
+        relative to the camera) onto the current render target, which is the
+        layer set by update_layer.
         :param line: The line to render
         :type line: Line from 'entities.py'
-        :param layer: The layer index from the Textures class to render onto
-        :type layer: int
         """
-        sdl2.SDL_SetRenderTarget(self.renderer, self.textures.get_layer(layer))
+        start = line.start
+        end = line.end
+        color = line.get_color()
         sdl2.sdlgfx.thickLineRGBA(
-            self.renderer, int(line.start[0]), int(line.start[1]),
-            int(line.end[0]), int(line.end[1]), int(line.thickness),
-            line.get_color()[0], line.get_color()[1], line.get_color()[2], 255)
+            self.renderer, int(start[0]), int(start[1]), int(end[0]),
+            int(end[1]), int(line.thickness), color[0], color[1], color[2],
+            255)
         return True
 
-    def render_window(self, window, layer = 0):
-        """Renders the window provided with absolute location onto the layer.
-        Renders a solid white rectangle for the background and black borders.
+    def render_window(self, window):
+        """Renders the window provided with absolute location onto the current
+        render target, which is the layer set by update_layer. Renders a solid
+        white rectangle for the background and black borders.
         :param window: The window to render
         :type window: Window from 'entities.py'
-        :param layer: The layer index from the Textures class to render onto
-        :type layer: int
         """
-        sdl2.SDL_SetRenderTarget(self.renderer, self.textures.get_layer(layer))
-        
-        # Render white background
-        sdl2.SDL_SetRenderDrawColor(self.renderer, 255, 255, 255, 255)
-        sdl2.SDL_RenderFillRect(self.renderer, sdl2.SDL_Rect(
-            window.x, window.y, window.width, window.height))
+        return self.render_rectangles([window], (255, 255, 255))
 
-        # Render black borders, render green borders if selected
-        if window.selected:
-            sdl2.SDL_SetRenderDrawColor(self.renderer, 34, 139, 34, 255)
-        else:
-            sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
-
-        # Top border
-        sdl2.SDL_RenderDrawLine(self.renderer, window.x, window.y,
-                                window.x + window.width - 1, window.y)
-
-        # Bottom border
-        sdl2.SDL_RenderDrawLine(self.renderer, window.x, window.y
-                                + window.height - 1,
-                                window.x + window.width - 1,
-                                window.y + window.height - 1)
-
-        # Left border
-        sdl2.SDL_RenderDrawLine(self.renderer, window.x, window.y,
-                                window.x, window.y + window.height - 1)
-
-        # Right border
-        sdl2.SDL_RenderDrawLine(self.renderer, window.x + window.width - 1,
-                                window.y, window.x + window.width - 1,
-                                window.y + window.height - 1)
-        return True
-
-    def render_door(self, door, layer = 0):
-        """Renders the door provided with absolute location onto the layer.
-        Renders a solid white rectangle for the background and black borders.
+    def render_door(self, door):
+        """Renders the door provided with absolute location onto the current
+        render target, which is the layer set by update_layer. Renders a solid
+        grey rectangle for the background and black borders.
         :param door: The door to render
         :type door: Door from 'entities.py'
-        :param layer: The layer index from the Textures class to render onto
-        :type layer: int
         """
-        sdl2.SDL_SetRenderTarget(self.renderer, self.textures.get_layer(layer))
-        
-        # Render grey background
-        sdl2.SDL_SetRenderDrawColor(self.renderer, 128, 128, 128, 255)
-        sdl2.SDL_RenderFillRect(self.renderer, sdl2.SDL_Rect(
-            door.x, door.y, door.width, door.height))
-        
-        # Render black borders, render green borders if selected
-        if door.selected:
-            sdl2.SDL_SetRenderDrawColor(self.renderer, 34, 139, 34, 255)
-        else:
-            sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
-
-        # Top border
-        sdl2.SDL_RenderDrawLine(self.renderer, door.x, door.y,
-                                door.x + door.width - 1, door.y)
+        return self.render_rectangles([door], (128, 128, 128))
+
+    def render_rectangles(self, entities, background):
+        """Renders the rectangular entities provided with absolute location
+        onto the current render target, which is the layer set by
+        update_layer. Renders solid backgrounds and black borders, or green
+        borders for selected entities. Entities are grouped by draw color,
+        so that each group is rendered with a single call.
+        :param entities: The entities to render
+        :type entities: list(RectangularEntity) from 'entities.py'
+        :param background: The background color in r, g, b values
+        :type background: tuple(int, int, int)
+        """
+        if not entities:
+            return True
 
-        # Bottom border
-        sdl2.SDL_RenderDrawLine(self.renderer, door.x, door.y
-                                + door.height - 1,
-                                door.x + door.width - 1,
-                                door.y + door.height - 1)
+        renderer = self.renderer
+        rectangles = [sdl2.SDL_Rect(entity.x, entity.y,
+                                    entity.width, entity.height)
+                      for entity in entities]
 
-        # Left border
-        sdl2.SDL_RenderDrawLine(self.renderer, door.x, door.y,
-                                door.x, door.y + door.height - 1)
+        # Render solid backgrounds
+        sdl2.SDL_SetRenderDrawColor(renderer, background[0], background[1],
+                                    background[2], 255)
+        sdl2.SDL_RenderFillRects(
+            renderer, (sdl2.SDL_Rect * len(rectangles))(*rectangles),
+            len(rectangles))
 
-        # Right border
-        sdl2.SDL_RenderDrawLine(self.renderer, door.x + door.width - 1,
-                                door.y, door.x + door.width - 1,
-                                door.y + door.height - 1)
+        # Render black borders, render green borders if selected
+        borders = [rectangle for entity, rectangle in zip(entities, rectangles)
+                   if not entity.selected]
+        selected_borders = [rectangle for entity, rectangle
+                            in zip(entities, rectangles) if entity.selected]
+
+        for color, group in (((0, 0, 0), borders),
+                             ((34, 139, 34), selected_borders)):
+            if not group:
+                continue
+            sdl2.SDL_SetRenderDrawColor(renderer, color[0], color[1],
+                                        color[2], 255)
+            sdl2.SDL_RenderDrawRects(
+                renderer, (sdl2.SDL_Rect * len(group))(*group), len(group))
         return True
 
-    def render_square_vertex(self, vertex, layer = 0):
+    def render_square_vertex(self, vertex):
         """Renders the square vertex provided with absolute location onto the
-        layer. Renders a solid black rectangle.
+        current render target, which is the layer set by update_layer.
+        Renders a solid black rectangle.
         :param vertex: The square vertex to render
         :type vertex: RectangularEntity from 'entities.py'
-        :param layer: The layer index from the Textures class to render onto
-        :type layer: int
         """
-        sdl2.SDL_SetRenderTarget(self.renderer, self.textures.get_layer(layer))
+        return self.render_square_vertices([vertex])
+
+    def render_square_vertices(self, vertices):
+        """Renders the square vertices provided with absolute location onto
+        the current render target as solid black rectangles, with a single
+        call for all vertices.
+        :param vertices: The square vertices to render
+        :type vertices: list(RectangularEntity) from 'entities.py'
+        """
+        if not vertices:
+            return True
+
+        rectangles = [sdl2.SDL_Rect(vertex.x, vertex.y,
+                                    vertex.width, vertex.height)
+                      for vertex in vertices]
+
         sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
-        sdl2.SDL_RenderFillRect(self.renderer, sdl2.SDL_Rect(
-            vertex.x, vertex.y, vertex.width, vertex.height))
+        sdl2.SDL_RenderFillRects(
+            self.renderer, (sdl2.SDL_Rect * len(rectangles))(*rectangles),
+            len(rectangles))
+        return True
 
     def render_loading(self):
         """Renders the loading screen as a task is blocking the renderer."""
         sdl2.SDL_RenderCopy(
-            self.renderer, self.textures.get(EntityType.LOADING), None,
-            sdl2.SDL_Rect(0, 0, self.screen_width, self.screen_height))
+            self.renderer, self.textures.get(EntityType.LOADING.value), None,
+            None)
 
     def set_dpi_awareness(self):
         """Sets the applications DPI awareness to per-monitor-aware,
-        so that the window scale is absolute (100%).
+        so that the window scale is absolute (100%). DPI awareness is only
+        set on Windows, other platforms have no windll.
         """
-        awareness = ctypes.c_int()
-        error = ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        if sys.platform != 'win32':
+            return
+
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)
 
     def get_screen_dimensions(self):
         """Returns the screen dimensions as a tuple."""
@@ -587,6 +899,7 @@ class View:
 
         self.screen_width = int(display_mode.w)
         self.screen_height = int(display_mode.h)
+        self.text_positions = {}
 
     def init_window(self):
         """Initializes the SDL window ands sets the minimum window size.
@@ -606,6 +919,10 @@ class View:
     def init_renderer(self):
         """Initializes the SDL renderer and sets the renderer hints.
         """
+        # Let SDL merge consecutive draws that share state into a single
+        # draw call; the hint must be set before the renderer is created
+        sdl2.SDL_SetHint(sdl2.SDL_HINT_RENDER_BATCHING, b'1')
+
         self.renderer = sdl2.SDL_CreateRenderer(
             self.window, -1, sdl2.SDL_RENDERER_ACCELERATED)
         sdl2.SDL_RenderSetIntegerScale(self.renderer, sdl2.SDL_FALSE)
@@ -619,6 +936,9 @@ class View:
         self.layer_width = layer_dimensions[0]
         self.layer_height = layer_dimensions[1]
 
+        # Grid line points depend on the layer dimensions
+        self.grid_points = {}
+
     def init_fonts(self, free_current = False):
         """Initializes the fonts based on the current screen dimensions.
         :param free_current: Whether to free the memory allocated for the
@@ -629,6 +949,9 @@ class View:
         if free_current:
             self.free_fonts()
 
+        # Cached text was rendered with the previous fonts
+        self.clear_text_cache()
+
         self.tiny_text = sdl2.sdlttf.TTF_OpenFont(
             b'../res/cour.ttf', int(self.screen_height * 0.013))
         self.small_text = sdl2.sdlttf.TTF_OpenFont(
@@ -638,6 +961,24 @@ class View:
         self.large_text = sdl2.sdlttf.TTF_OpenFont(
             b'../res/cour.ttf', int(self.screen_height * 0.021))
 
+        # Fonts and glyph atlases indexed by FontSize
+        self.fonts = (self.small_text, self.medium_text, self.large_text,
+                      self.tiny_text)
+        self.glyph_atlases = tuple(
+            GlyphAtlas(self.renderer, font) for font in self.fonts)
+
+    def init_text_cache(self):
+        """Initializes the cache of rendered text textures.
+        """
+        self.text_cache = OrderedDict()
+
+    def clear_text_cache(self):
+        """Frees memory allocated by SDL for the cached text textures.
+        """
+        for texture, width, height in self.text_cache.values():
+            sdl2.SDL_DestroyTexture(texture)
+        self.text_cache.clear()
+
     def resize_fonts(self):
         """Re-initializes the fonts."""
         self.init_fonts(True)
@@ -650,6 +991,10 @@ class View:
         sdl2.sdlttf.TTF_CloseFont(self.medium_text)
         sdl2.sdlttf.TTF_CloseFont(self.large_text)
 
+        for atlas in self.glyph_atlases:
+            atlas.unload()
+        self.glyph_atlases = ()
+
     def reset_camera_values(self):
         self.camera_x = 0
         self.camera_y = 0
@@ -660,6 +1005,7 @@ class View:
         by SDL for the window and renderer.
         """
         self.textures.unload()
+        self.clear_text_cache()
         self.free_fonts()
 
         sdl2.SDL_DestroyWindow(self.window)
@@ -671,4 +1017,9 @@ class View:
         sdl2.sdlttf.TTF_Quit()
         sdl2.SDL_Quit()
 
-FontSize = Enum('Font Size', 'SMALL MEDIUM LARGE')
\ No newline at end of file
+class FontSize:
+    """Enum for indexing the fonts and glyph atlases in the view."""
+    SMALL = 0
+    MEDIUM = 1
+    LARGE = 2
+    TINY = 3
\ No newline at end of file
@@ -1,5 +1,5 @@
 import ctypes, sdl2, sys, threading, unittest, os.path
-sys.path.append("..\src")
+sys.path.append(os.path.join("..", "src"))
 
 from app import App
 from camera import Camera
@@ -37,6 +37,26 @@ class ControllerTests(unittest.TestCase):
         controller.handle_text_input(event)
         self.assertEqual(controller.text, '')
 
+    def test_window_resized(self):
+        """Ensure resizing the window updates the screen size without
+        rendering the layers again, unless the renderer lost them.
+        """
+        model = Model()
+        model.update_needed = False
+        controller = Controller()
+        controller.window_resized = False
+
+        event = sdl2.SDL_Event()
+        event.type = sdl2.SDL_WINDOWEVENT
+        event.window.event = sdl2.SDL_WINDOWEVENT_SIZE_CHANGED
+        controller.handle_mouse_events(model, event)
+        self.assertTrue(controller.window_resized)
+        self.assertFalse(model.update_needed)
+
+        event.type = sdl2.SDL_RENDER_TARGETS_RESET
+        controller.handle_mouse_events(model, event)
+        self.assertTrue(model.update_needed)
+
     def test_update_bottom_right_text(self):
         """Ensure the bottom right text displays the current mouse coordinates
         and camera scale.
@@ -444,6 +464,22 @@ class ControllerTests(unittest.TestCase):
             message_stack.update()
         self.assertEqual(len(message_stack.text), 0)
 
+    def test_message_stack_single_update(self):
+        """Ensure a single update removes every expired message and stacks
+        the remaining messages.
+        """
+        MessageStack.DURATION = 5000
+        message_stack = MessageStack()
+        message_stack.insert(['message 1', 'message 2', 'message 3'])
+        message_stack.text[0].time -= MessageStack.DURATION * 2
+        message_stack.text[2].time -= MessageStack.DURATION * 2
+
+        message_stack.update()
+        self.assertEqual(len(message_stack.text), 1)
+        self.assertEqual(message_stack.text[0].text, 'message 2')
+        self.assertEqual(message_stack.text[0].relative_y,
+                         MessageStack.RELATIVE_Y)
+
     def test_update_item_to_move(self):
         """Ensure that update_item_to_move selects a single entity from
         the selected entities when selected entities is not empty.
@@ -618,5 +654,23 @@ class PanelTests(unittest.TestCase):
         self.assertTrue(panel.mouse_over(0, 0, [1920, 1080]))
         self.assertEqual(panel.button_over, 1)
 
+    def test_button_locations(self):
+        """Ensure button locations are reused until the screen dimensions
+        change and that the icon is a square within the button.
+        """
+        button = Button(1, 1, 0.1, 0.1, 0.2, 0.1)
+        location = button.get_location((1000, 500))
+        self.assertEqual((location.x, location.y, location.w, location.h),
+                         (100, 50, 200, 50))
+        self.assertIs(button.get_location((1000, 500)), location)
+
+        icon_location = button.get_icon_location((1000, 500))
+        self.assertEqual((icon_location.x, icon_location.y,
+                          icon_location.w, icon_location.h),
+                         (150, 50, 50, 50))
+
+        location = button.get_location((2000, 1000))
+        self.assertEqual((location.w, location.h), (400, 100))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
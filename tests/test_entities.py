@@ -1,5 +1,5 @@
-import sdl2, sys, unittest
-sys.path.append("..\src")
+import os.path, sdl2, sys, unittest
+sys.path.append(os.path.join("..", "src"))
 
 from entities import Line, RectangularEntity, Door, Window
 from entity_types import EntityType
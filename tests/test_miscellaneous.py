@@ -1,10 +1,11 @@
 import sys, unittest, os.path
-sys.path.append("..\src")
+sys.path.append(os.path.join("..", "src"))
 
 from app import App
+from ctypes import addressof
 from controller import Controller
 from model import Model
-from tools import Tools, ExportCommand
+from tools import Tools, ExportCommand, Exporter
 from view import View
 
 class ToolsTests(unittest.TestCase):
@@ -19,15 +20,81 @@ class ToolsTests(unittest.TestCase):
         self.assertEqual(Tools.convert_to_unit_system(-5), '0 ft 5 in')
         self.assertEqual(Tools.convert_to_unit_system(0, ''), '')
 
+    def test_cached_convert_to_unit_system(self):
+        """Ensure values converting to the same whole inches share the
+        cached result.
+        """
+        Tools.convert_to_feet_and_inches.cache_clear()
+        self.assertEqual(Tools.convert_to_unit_system(15.2), '1 ft 3 in')
+        self.assertEqual(Tools.convert_to_unit_system(15.7), '1 ft 3 in')
+        self.assertEqual(Tools.convert_to_unit_system(-15), '1 ft 3 in')
+
+        cache_info = Tools.convert_to_feet_and_inches.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 2)
+
     def test_export_command(self):
         """Ensure the export command creates an export.png file, signaling
         that it has successfully exported the texture.
         """
         app = App()
+        Exporter.last_export = -Exporter.EXPORT_INTERVAL
         app.commands.append(ExportCommand())
         app.execute_commands()
+        Exporter.wait()
         self.assertTrue(os.path.isfile('export.png'))
 
+    def test_export_interval(self):
+        """Ensure an export records its time so that another export within
+        the export interval is skipped.
+        """
+        app = App()
+        Exporter.last_export = -Exporter.EXPORT_INTERVAL
+        Exporter(app.view.renderer, app.view.textures.get_layer(0))
+        last_export = Exporter.last_export
+        self.assertGreaterEqual(last_export, 0)
+
+        Exporter(app.view.renderer, app.view.textures.get_layer(0))
+        self.assertEqual(Exporter.last_export, last_export)
+
+    def test_export_surface_reuse(self):
+        """Ensure consecutive exports of the same size reuse the surface.
+        """
+        app = App()
+        Exporter.last_export = -Exporter.EXPORT_INTERVAL
+        Exporter(app.view.renderer, app.view.textures.get_layer(0))
+        surface = Exporter.surface
+
+        Exporter.last_export = -Exporter.EXPORT_INTERVAL
+        Exporter(app.view.renderer, app.view.textures.get_layer(0))
+        self.assertEqual(addressof(Exporter.surface.contents),
+                         addressof(surface.contents))
+
+        Exporter.free_surface()
+        self.assertIsNone(Exporter.surface)
+
+    def test_export_postprocess(self):
+        """Ensure the export postprocess hook receives every exported pixel.
+        """
+        app = App()
+        Exporter.last_export = -Exporter.EXPORT_INTERVAL
+        received = []
+        postprocess = Exporter.postprocess
+        Exporter.postprocess = lambda pixels, width, height, pitch:\
+            received.append((len(pixels), width, height, pitch))
+
+        try:
+            Exporter(app.view.renderer, app.view.textures.get_layer(0))
+            Exporter.wait()
+        finally:
+            Exporter.postprocess = postprocess
+
+        self.assertEqual(len(received), 1)
+        size, width, height, pitch = received[0]
+        self.assertEqual(width, app.view.layer_width)
+        self.assertEqual(height, app.view.layer_height)
+        self.assertEqual(size, height * pitch)
+
 class AppTests(unittest.TestCase):
     """Tests for the App class (app.py)."""
 
@@ -39,6 +106,15 @@ class AppTests(unittest.TestCase):
         self.assertIsInstance(app.controller, Controller)
         self.assertIsInstance(app.view, View)
 
+    def test_first_frame_updates(self):
+        """Ensure a freshly started app renders the whole layer and updates
+        the screen size on its first frame.
+        """
+        app = App()
+        self.assertTrue(app.model.update_needed)
+        self.assertIsNone(app.model.update_area)
+        self.assertTrue(app.controller.window_resized)
+
     def test_loading(self):
         """Ensure app can load entities into the model from a save file.
         """
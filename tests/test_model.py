@@ -1,5 +1,5 @@
-import sdl2, sys, unittest
-sys.path.append("..\src")
+import os.path, sdl2, sys, unittest
+sys.path.append(os.path.join("..", "src"))
 
 from app import App
 from entity_types import EntityType
@@ -29,6 +29,36 @@ class ModelTests(unittest.TestCase):
                          Line.INTERIOR_WALL)
         self.assertTrue(app.model.update_needed)
 
+    def test_update_area(self):
+        """Ensure adding entities only requests an update of the area they
+        cover once the layer was updated in whole, and that a full layer
+        update takes precedence.
+        """
+        model = Model()
+        self.assertTrue(model.update_needed)
+        self.assertIsNone(model.update_area)
+
+        model.add_line(EntityType.EXTERIOR_WALL, (0, 0), (50, 0))
+        self.assertIsNone(model.update_area)
+
+        model.update_needed = False
+        line = model.add_line(EntityType.EXTERIOR_WALL, (0, 0), (100, 0))
+        self.assertTrue(model.update_needed)
+        self.assertEqual(model.update_area, line.get_bounds())
+
+        window = model.add_window((200, 200))
+        self.assertEqual(model.update_area,
+                         (line.get_bounds()[0], line.get_bounds()[1],
+                          window.get_bounds()[2], window.get_bounds()[3]))
+
+        model.update_needed = True
+        model.add_door((400, 400))
+        self.assertIsNone(model.update_area)
+
+        model.update_needed = False
+        self.assertFalse(model.update_needed)
+        self.assertIsNone(model.update_area)
+
     def test_add_vertices_from_line(self):
         """Ensure add_vertices_from_line adds line
         vertices after adding a new line.
@@ -1,5 +1,5 @@
 import glob, sdl2, sys, unittest, os.path
-sys.path.append("..\src")
+sys.path.append(os.path.join("..", "src"))
 
 from actions import AddAction, DeleteAction
 from app import App
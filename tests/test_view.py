@@ -1,10 +1,13 @@
-import sdl2, sys, unittest
-sys.path.append("..\src")
+import os.path, sdl2, sys, unittest
+sys.path.append(os.path.join("..", "src"))
 
 from app import App
-from ctypes import c_int, pointer
-from entities import UserText
+from controller import Controller
+from ctypes import byref, c_int, c_uint8, c_uint32
+from entities import Line, UserText
 from entity_types import EntityType
+from model import Model
+from panels import Button
 from text import Text
 from textures import Textures
 from view import View, FontSize
@@ -24,13 +27,62 @@ class TexturesTests(unittest.TestCase):
         self.assertIsNotNone(texture)
 
         # Ensure texture has expected size (matches png file).
-        width = pointer(c_int(0))
-        height = pointer(c_int(0))
-        sdl2.SDL_QueryTexture(texture, None, None, width, height)
-        width = width.contents.value
-        height = height.contents.value
-        self.assertEqual(width, 500)
-        self.assertEqual(height, 500)
+        width = c_int(0)
+        height = c_int(0)
+        sdl2.SDL_QueryTexture(texture, None, None, byref(width), byref(height))
+        self.assertEqual(width.value, 500)
+        self.assertEqual(height.value, 500)
+
+    def test_load_texture_files(self):
+        """Ensure every png file in the texture table is loaded.
+        """
+        app = App()
+        for entity_type, filename in Textures.TEXTURE_FILES:
+            self.assertTrue(app.view.textures.get(entity_type.value))
+
+    def test_lazy_texture(self):
+        """Ensure lazily loaded textures are only loaded once first used.
+        """
+        app = App()
+        loading = EntityType.LOADING.value
+        self.assertIsNone(app.view.textures.textures[loading])
+        self.assertTrue(app.view.textures.get(loading))
+        self.assertTrue(app.view.textures.textures[loading])
+
+    def test_atlas_icons(self):
+        """Ensure icons share the atlas texture with distinct source areas
+        while larger textures are not packed.
+        """
+        app = App()
+        textures = app.view.textures
+        select = EntityType.SELECT_BUTTON.value
+        erase = EntityType.ERASE_BUTTON.value
+        self.assertIs(textures.get(select), textures.atlas)
+        self.assertIs(textures.get(erase), textures.atlas)
+        self.assertNotEqual(
+            (textures.get_source(select).x, textures.get_source(select).y),
+            (textures.get_source(erase).x, textures.get_source(erase).y))
+
+        panel = EntityType.BUTTON_PANEL.value
+        self.assertIsNot(textures.get(panel), textures.atlas)
+        self.assertIsNone(textures.get_source(panel))
+
+    def test_layer_format(self):
+        """Ensure layers are created with an opaque pixel format.
+        """
+        app = App()
+        layer_format = c_uint32(0)
+        sdl2.SDL_QueryTexture(app.view.textures.get_layer(0),
+                              byref(layer_format), None, None, None)
+        self.assertIn(layer_format.value, Textures.LAYER_FORMATS)
+
+        # Full color depth is preferred whenever the renderer supports it
+        info = sdl2.SDL_RendererInfo()
+        info.num_texture_formats = 2
+        info.texture_formats[0] = sdl2.SDL_PIXELFORMAT_RGB565
+        info.texture_formats[1] = sdl2.SDL_PIXELFORMAT_RGB888
+        self.assertEqual(app.view.textures.get_layer_format(info),
+                         sdl2.SDL_PIXELFORMAT_RGB888)
 
     def test_destructor(self):
         """Ensure textures and layers are cleared after calling unload.
@@ -41,13 +93,32 @@ class TexturesTests(unittest.TestCase):
         self.assertEqual(len(app.view.textures.layers), 0)
 
 class ViewTests(unittest.TestCase):
-    """Tests for the View class (view.py)."""
+    """Tests for the View class (view.py). The tests share one app so that
+    SDL, the fonts, and the textures are only initialized once."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Initializes the app shared by the tests."""
+        cls.app = App()
+
+    def setUp(self):
+        """Gives each test an empty model and controller and resets the view
+        state left behind by previous tests.
+        """
+        self.app.model = Model()
+        self.app.controller = Controller()
+
+        view = self.app.view
+        view.update_screen_size()
+        view.clear_text_cache()
+        for atlas in view.glyph_atlases:
+            atlas.queue.clear()
 
     def test_initialization(self):
         """Ensure the view constructor initializes the SDL
         components and textures.
         """
-        app = App()
+        app = self.app
         self.assertIsNotNone(app.view.window)
         self.assertIsNotNone(app.view.renderer)
         self.assertIsInstance(app.view.textures, Textures)
@@ -55,7 +126,7 @@ class ViewTests(unittest.TestCase):
     def test_camera_values(self):
         """Ensure view takes in the UI camera's position and scale.
         """
-        app = App()
+        app = self.app
         app.controller.camera.x = 500
         app.controller.camera.y = 1000
         app.controller.camera.scale = 0.75
@@ -65,17 +136,55 @@ class ViewTests(unittest.TestCase):
         self.assertEqual(int(app.view.camera_y), 1000)
         self.assertEqual(app.view.camera_scale, 0.75)
 
+    def test_unchanged_frame(self):
+        """Ensure a frame is only rendered again after input, a model change,
+        or a change of the displayed text.
+        """
+        app = self.app
+        self.assertTrue(app.view.frame_changed(app.model, app.controller))
+        self.assertFalse(app.view.frame_changed(app.model, app.controller))
+
+        app.controller.center_text.set_top_text('changed')
+        self.assertTrue(app.view.frame_changed(app.model, app.controller))
+
+        app.model.update_needed = True
+        self.assertTrue(app.view.frame_changed(app.model, app.controller))
+        app.model.update_needed = False
+
+    def test_visible_layer_area(self):
+        """Ensure only the part of the layer visible to the camera is
+        selected for rendering.
+        """
+        view = self.app.view
+        view.screen_width = 1000
+        view.screen_height = 500
+
+        view.camera_x = 100
+        view.camera_y = 50
+        view.camera_scale = 2.0
+        area = view.get_visible_layer_area()
+        self.assertEqual((area.x, area.y, area.w, area.h), (50, 25, 500, 250))
+
+        view.camera_x = -100
+        view.camera_y = -100
+        view.camera_scale = 1.0
+        area = view.get_visible_layer_area()
+        self.assertEqual((area.x, area.y, area.w, area.h), (0, 0, 900, 400))
+
+        view.camera_x = view.layer_width
+        self.assertIsNone(view.get_visible_layer_area())
+
     def test_empty_update_layers(self):
         """Ensure no entities are rendered onto the layer if entities are empty.
         """
-        app = App()
+        app = self.app
         self.assertEqual(app.view.update_layer(
             app.model, app.controller), 0)
 
     def test_base_update_layers(self):
         """Ensure expected number of entities are rendered onto the layer.
         """
-        app = App()
+        app = self.app
         for i in range(5):
             app.model.add_line(EntityType.EXTERIOR_WALL)
 
@@ -93,10 +202,27 @@ class ViewTests(unittest.TestCase):
         app.model.doors.clear()
         app.model.square_vertices.clear()
 
+    def test_grid_points(self):
+        """Ensure the grid polylines contain two points per grid line and are
+        reused for the same snap interval.
+        """
+        app = self.app
+        horizontal, vertical = app.view.get_grid_points(6)
+
+        self.assertEqual(len(horizontal),
+                         2 * len(range(0, app.view.layer_height, 12)))
+        self.assertEqual(len(vertical),
+                         2 * len(range(0, app.view.layer_width, 12)))
+        self.assertEqual((horizontal[0].x, horizontal[1].x),
+                         (-6, app.view.layer_width))
+        self.assertEqual((horizontal[2].x, horizontal[3].x),
+                         (app.view.layer_width, -6))
+        self.assertIs(app.view.get_grid_points(6)[0], horizontal)
+
     def test_render_ui_text(self):
         """Ensure expected number of text displayers are rendered from the UI.
         """
-        app = App()
+        app = self.app
         app.model.add_user_text('text')
         self.assertEqual(app.view.render_ui_text(
             app.controller), 3)
@@ -105,14 +231,14 @@ class ViewTests(unittest.TestCase):
         """Ensure render text returns None if the text is None or if the text
         string is empty.
         """
-        app = App()
+        app = self.app
         self.assertIsNone(app.view.render_relative_text(None))
         self.assertIsNone(app.view.render_relative_text(Text()))
 
     def test_render_text(self):
         """Ensure render_text completes rendering of a non-empty text.
         """
-        app = App()
+        app = self.app
         text = Text()
         text.text = 'Non empty text'
 
@@ -124,10 +250,112 @@ class ViewTests(unittest.TestCase):
         text.font = FontSize.LARGE
         self.assertTrue(app.view.render_relative_text(text))
 
+    def test_text_position(self):
+        """Ensure text positions are centered or moved to fit the screen
+        depending on their relative location.
+        """
+        view = self.app.view
+        view.text_positions = {}
+        view.screen_width = 1000
+        view.screen_height = 500
+
+        self.assertEqual(view.get_text_position(0.50, 0.25),
+                         (500, 125, 0.50, 0))
+        self.assertEqual(view.get_text_position(0.75, 0.75),
+                         (750, 375, 1, 1))
+        self.assertEqual(view.get_text_position(0.25, 0.50),
+                         (250, 250, 0, 0))
+
+    def test_text_cache(self):
+        """Ensure rendering the same text again reuses the cached texture and
+        that the cache is cleared when the fonts are re-initialized.
+        """
+        app = self.app
+        text = Text()
+        text.text = 'Cached text'
+
+        self.assertTrue(app.view.render_relative_text(text))
+        self.assertTrue(app.view.render_relative_text(text))
+        self.assertEqual(len(app.view.text_cache), 1)
+
+        text.font = FontSize.LARGE
+        self.assertTrue(app.view.render_relative_text(text))
+        self.assertEqual(len(app.view.text_cache), 2)
+
+        app.view.resize_fonts()
+        self.assertEqual(len(app.view.text_cache), 0)
+
+    def test_user_text_cache(self):
+        """Ensure user text is rasterized once and then drawn from the cache.
+        """
+        app = self.app
+        text = UserText('cached user text')
+
+        self.assertTrue(app.view.render_user_text(text))
+        self.assertTrue(app.view.render_user_text(text))
+        self.assertEqual(len(app.view.text_cache), 1)
+
+        texture, width, height = next(iter(app.view.text_cache.values()))
+        self.assertGreater(width, 0)
+        self.assertGreater(height, 0)
+
+    def test_render_dynamic_text(self):
+        """Ensure dynamic text is rendered from the glyph atlas without
+        adding textures to the text cache, with or without geometry.
+        """
+        app = self.app
+        text = Text(dynamic = True)
+        text.text = 'FPS: 60'
+
+        atlas = app.view.glyph_atlases[FontSize.SMALL]
+        self.assertTrue(app.view.render_relative_text(text))
+        self.assertEqual(len(app.view.text_cache), 0)
+        self.assertEqual(len(atlas.queue), 1)
+
+        atlas.flush(app.view.renderer)
+        self.assertEqual(len(atlas.queue), 0)
+
+        self.assertGreater(atlas.get_width(text.text), 0)
+        self.assertEqual(atlas.get_width(''), 0)
+
+        render_geometry = atlas.render_geometry
+        atlas.render_geometry = False
+        try:
+            self.assertTrue(app.view.render_relative_text(text))
+            atlas.flush(app.view.renderer)
+            self.assertEqual(len(atlas.queue), 0)
+        finally:
+            atlas.render_geometry = render_geometry
+
+    def test_atlas_text_width(self):
+        """Ensure atlas text is laid out by glyph advance, including the
+        advance of spaces.
+        """
+        atlas = self.app.view.glyph_atlases[FontSize.MEDIUM]
+        self.assertGreater(atlas.advances[' '], 0)
+        self.assertEqual(atlas.get_width('10 ft 2 in'),
+                         atlas.get_width('10ft2in') + 3 * atlas.advances[' '])
+
+    def test_dynamic_text_fallback(self):
+        """Ensure dynamic text with characters that are not in the glyph
+        atlas is rendered whole from the text cache instead.
+        """
+        app = self.app
+        text = Text(dynamic = True)
+        text.text = 'Länge: 5 ft'
+
+        atlas = app.view.glyph_atlases[FontSize.SMALL]
+        self.assertFalse(atlas.has_characters(text.text))
+        self.assertTrue(atlas.has_characters('Length: 5 ft'))
+
+        self.assertTrue(app.view.render_relative_text(text))
+        self.assertEqual(len(atlas.queue), 0)
+        self.assertEqual(len(app.view.text_cache), 1)
+
     def test_center_text(self):
         """Ensures center_text returns the expected values for base cases.
         """
-        app = App()
+        app = self.app
         app.view.screen_width = 1920
         app.view.screen_height = 1080
         self.assertEqual(app.view.center_text(250), 835)
@@ -137,7 +365,7 @@ class ViewTests(unittest.TestCase):
         """Ensure that functions that only render do not throw exceptions.
         These functions must be tested interactively.
         """
-        app = App()
+        app = self.app
         self.assertTrue(app.view.render_two_point_placement(
             app.controller, app.model))
         
@@ -147,14 +375,53 @@ class ViewTests(unittest.TestCase):
         self.assertTrue(app.view.render_mouse_selection(
             app.controller))
 
+        self.assertTrue(app.view.render_vertex_marker((5, 5)))
+
+        self.assertTrue(app.view.render_rectangles([], (255, 255, 255)))
+
+        self.assertTrue(app.view.render_lines(
+            [Line((0, 0), (5, 5), 6), Line((5, 5), (5, 5))]))
+
         self.assertTrue(app.view.render_user_text(
             UserText('text')))
 
+    def test_button_background_tint(self):
+        """Ensure selected and unselected buttons tint the one shared button
+        background texture.
+        """
+        view = self.app.view
+        texture = view.textures.get(EntityType.BUTTON_BACKGROUND.value)
+        button = Button(0, EntityType.SELECT_BUTTON.value)
+        r, g, b = c_uint8(), c_uint8(), c_uint8()
+
+        view.render_button_background(button)
+        sdl2.SDL_GetTextureColorMod(texture, byref(r), byref(g), byref(b))
+        self.assertEqual(r.value, View.BUTTON_COLOR.r)
+
+        button.selected = True
+        view.render_button_background(button)
+        sdl2.SDL_GetTextureColorMod(texture, byref(r), byref(g), byref(b))
+        self.assertEqual(r.value, View.SELECTED_BUTTON_COLOR.r)
+
+    def test_rendering_without_geometry(self):
+        """Ensure lines and vertex markers are still rendered when the SDL
+        version cannot render geometry.
+        """
+        view = self.app.view
+        render_geometry = view.render_geometry
+        view.render_geometry = False
+        try:
+            self.assertTrue(view.render_lines(
+                [Line((0, 0), (5, 5), 6), Line((5, 5), (5, 5))]))
+            self.assertTrue(view.render_vertex_marker((5, 5)))
+        finally:
+            view.render_geometry = render_geometry
+
     def test_switching_between_layers(self):
         """Ensure update layer renders only the number of entities there are
         in each layer when switching between layers.
         """
-        app = App()
+        app = self.app
 
         for i in range(4):
             line = app.model.add_line(EntityType.EXTERIOR_WALL)
@@ -168,7 +435,10 @@ class ViewTests(unittest.TestCase):
 
         app.controller.current_layer = 1
         self.assertTrue(app.view.update_layer(app.model, app.controller), 2)
-        
+
+class ViewDestructorTests(unittest.TestCase):
+    """Tests for exiting the View class (view.py), which shuts down SDL."""
+
     def test_destructor(self):
         """Ensures destructor clears textures and sets SDL components to None.
         """